@@ -1,5 +1,6 @@
 import os
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import Optional, Dict
 
 from openai import OpenAI
@@ -24,7 +25,9 @@ class V2Config:
     request_timeout_sec: int
 
 
+@lru_cache(maxsize=1)
 def load_config() -> V2Config:
+    # Environment is read once per process; call load_config.cache_clear() to pick up changes
     # Accept broader env names and fall back to V2_* where present
     api_key = _get_secret_or_env("OPENROUTER_API_KEY", "")
     context_model = _get_secret_or_env("V2_OPENROUTER_CONTEXT_MODEL") or _get_secret_or_env("OPENROUTER_VIDEO_MODEL", "gpt-5-mini")
@@ -48,9 +51,19 @@ def load_config() -> V2Config:
 def create_openrouter_client(api_key: Optional[str] = None) -> OpenAI:
     key = api_key or _get_secret_or_env("OPENROUTER_API_KEY", "")
     # OpenRouter recommends sending HTTP-Referer and X-Title
+    return _cached_openrouter_client(
+        key,
+        _get_secret_or_env("V2_HTTP_REFERER", "http://localhost"),
+        _get_secret_or_env("V2_APP_TITLE", "Project Maestro v2"),
+    )
+
+
+@lru_cache(maxsize=4)
+def _cached_openrouter_client(key: str, referer: str, title: str) -> OpenAI:
+    # One client per key/headers: reloading settings reuses its HTTP connection pool
     default_headers: Dict[str, str] = {
-        "HTTP-Referer": _get_secret_or_env("V2_HTTP_REFERER", "http://localhost"),
-        "X-Title": _get_secret_or_env("V2_APP_TITLE", "Project Maestro v2"),
+        "HTTP-Referer": referer,
+        "X-Title": title,
     }
     client = OpenAI(
         api_key=key,
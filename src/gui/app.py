@@ -1,17 +1,71 @@
 from __future__ import annotations
 
 import os
+import shutil
+import subprocess
+import sys
 import threading
-import queue
+import time
+from collections import deque
+from dataclasses import replace
+from tkinter.filedialog import askopenfilename, asksaveasfilename
 
 import customtkinter as ctk
 
 from src.config import load_config
 from src.gui.pipeline import Pipeline
-from src.gui.state import AppState
-from src.gui.utils_images import data_url_to_ctkimage
-from src.services.video import sample_middle_frame_as_data_url
+from src.gui.state import LOG_HISTORY_MAX, AppState
+from src.gui.utils_images import (
+    bytes_to_ctkimage,
+    bytes_to_preview_pil,
+    data_url_to_ctkimage,
+    data_url_to_preview_pil,
+    pil_to_ctkimage,
+)
+from src.services.storage import data_url_to_bytes_and_mime, save_bytes_to_dir
 from src.services import connectivity_probe, openrouter_models_probe, openrouter_chat_probe
+from src.services.images import shutdown_image_pool
+from src.services.workers import DaemonThreadPoolExecutor
+
+# Upscaled shots are autosaved here (project-root/output)
+OUTPUT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "output"))
+# Workers wake the Tk thread with this virtual event after queueing work for it
+EVENT_WAKE = "<<MaestroEvent>>"
+# Safety-net drain interval (ms) in case a wake-up is lost (e.g. posted before mainloop started)
+DRAIN_FALLBACK_MS = 1000
+# Log panel / status bar refresh interval while lines are streaming in (ms), ~30 Hz
+LOG_FLUSH_MS = 33
+# Context word count refresh delay after the last keystroke (ms)
+WORD_COUNT_DELAY_MS = 150
+# UI scale and theme changes are applied this long after the last click (ms)
+UI_APPLY_DELAY_MS = 200
+# Shot preview thumbnail width (px)
+SHOT_PREVIEW_WIDTH = 150
+# Workers for analysis / director calls and connectivity probes (network waits)
+NETWORK_WORKERS = 4
+# Workers for short local jobs: preview decodes, Save copies, .env writes
+IO_WORKERS = 2
+# Minimum time between toast updates (s); messages arriving faster replace the pending one
+TOAST_MIN_INTERVAL_SEC = 0.5
+# Settings written by "Save + Write .env"
+ENV_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".env"))
+# Option-menu choices, built once at import
+SHOT_COUNT_VALUES = tuple(str(n) for n in range(3, 11))
+TEXT_SCALE_VALUES = ("90%", "100%", "110%", "125%", "150%")
+
+# Real-ESRGAN pulls in torch; resolved on first use, then reused without touching the import system
+_UPSCALER = None
+_UPSCALER_LOCK = threading.Lock()
+
+
+def _get_upscaler():
+    global _UPSCALER
+    if _UPSCALER is None:
+        with _UPSCALER_LOCK:
+            if _UPSCALER is None:
+                from src.services.upscaler import get_upscaler
+                _UPSCALER = get_upscaler()
+    return _UPSCALER
 
 
 class MaestroApp(ctk.CTk):
@@ -22,12 +76,59 @@ class MaestroApp(ctk.CTk):
         self.minsize(1000, 700)
 
         self.app_state = AppState(cfg=load_config())
+        # Workers append, the Tk thread pops; deque append/popleft are atomic, so no lock is needed
+        self.events: "deque[tuple]" = deque()
+        # Log lines waiting for the next flush (see _on_log)
+        self._log_buf: list[str] = []
+        self._log_flush_pending = False
+        # Text last applied to the status bar (see _set_status)
+        self._status_text = ""
+        # Pending word-count refresh (see _schedule_word_count)
+        self._wc_after_id: str | None = None
+        # Parsed .env as (mtime_ns, values); writes are serialized by the lock (see _write_env)
+        self._env_cache: tuple[int, dict[str, str]] | None = None
+        self._env_lock = threading.Lock()
+        # Shared toast window and its rate limiting (see show_toast)
+        self._toast: ctk.CTkToplevel | None = None
+        self._toast_label: ctk.CTkLabel | None = None
+        self._toast_pending: tuple[str, int] | None = None
+        self._toast_after_id: str | None = None
+        self._toast_hide_id: str | None = None
+        self._toast_last = 0.0
+        # Last options set on the action buttons (see _configure_if_changed)
+        self._widget_opts: dict[str, dict[str, object]] = {}
+        # Pending UI scale / theme applications (see _on_text_scale_change, _toggle_theme)
+        self._scale_after_id: str | None = None
+        self._theme_after_id: str | None = None
         self.pipeline = Pipeline(self.app_state.cfg, on_log=self._on_log)
-        self.events: "queue.Queue[tuple]" = queue.Queue()
+        # True while Analyze or Generate Shots runs; keeps both buttons disabled across refreshes
+        self._action_running = False
+        # Video last sent for analysis; analyzing it again asks the model for a fresh context
+        self._analyzed_video: str | None = None
+        self.shot_widgets: dict[int, dict[str, ctk.CTkBaseClass]] = {}
+        # Long-lived workers, reused across clicks. Daemon threads, so closing the window never
+        # waits on an in-flight request. Network waits and short local jobs get separate pools so
+        # a slow API call can never queue a preview, a Save or a .env write behind it
+        self._executor = DaemonThreadPoolExecutor(max_workers=NETWORK_WORKERS, thread_name_prefix="maestro")
+        self._io_executor = DaemonThreadPoolExecutor(max_workers=IO_WORKERS, thread_name_prefix="maestro-io")
+        # Upscaling is serialized on one warm model; a dedicated worker keeps it from tying up the pool above.
+        # Also daemon: a running upscale or the startup model download must not keep the process alive
+        self._upscale_executor = DaemonThreadPoolExecutor(max_workers=1, thread_name_prefix="upscale")
+        self.protocol("WM_DELETE_WINDOW", self._on_close)
+
+        # Shared fonts: each CTkFont registers a Tk font, so build every size once and reuse it
+        self._font_title = ctk.CTkFont(size=16, weight="bold")
+        self._font_heading = ctk.CTkFont(size=14, weight="bold")
+        self._font_body_bold = ctk.CTkFont(size=13, weight="bold")
+        self._font_body = ctk.CTkFont(size=13)
+        self._font_text = ctk.CTkFont(size=12)
+        self._font_small = ctk.CTkFont(size=11)
+        self._font_tiny = ctk.CTkFont(size=10)
 
         self._build_ui()
         self._setup_keyboard_shortcuts()
-        self.after(50, self._drain_events)
+        self.bind(EVENT_WAKE, lambda _e: self._drain_events())
+        self.after(DRAIN_FALLBACK_MS, self._drain_fallback)
         self.after(150, self._post_init_checks)
         # Ensure action buttons reflect prerequisites at startup
         try:
@@ -70,7 +171,7 @@ class MaestroApp(ctk.CTk):
         sidebar_title = ctk.CTkLabel(
             sidebar_header,
             text="🎬 Project Maestro",
-            font=ctk.CTkFont(size=16, weight="bold")
+            font=self._font_title
         )
         sidebar_title.pack(anchor="w")
 
@@ -82,7 +183,7 @@ class MaestroApp(ctk.CTk):
         file_label = ctk.CTkLabel(
             file_section,
             text="📁 Files",
-            font=ctk.CTkFont(size=14, weight="bold"),
+            font=self._font_heading,
             text_color=("gray60", "gray40")
         )
         file_label.pack(anchor="w", pady=(0, 8))
@@ -92,7 +193,7 @@ class MaestroApp(ctk.CTk):
             text="📹 Open Video",
             command=self._open_video,
             height=36,
-            font=ctk.CTkFont(size=13)
+            font=self._font_body
         )
         # tooltips disabled
 
@@ -101,7 +202,7 @@ class MaestroApp(ctk.CTk):
             text="🎨 Open Style Image",
             command=self._open_style,
             height=36,
-            font=ctk.CTkFont(size=13)
+            font=self._font_body
         )
         # tooltips disabled
         self.btn_open_video.pack(pady=(0, 4), fill="x")
@@ -115,7 +216,7 @@ class MaestroApp(ctk.CTk):
         action_label = ctk.CTkLabel(
             action_section,
             text="⚡ Actions",
-            font=ctk.CTkFont(size=14, weight="bold"),
+            font=self._font_heading,
             text_color=("gray60", "gray40")
         )
         action_label.pack(anchor="w", pady=(0, 8))
@@ -125,14 +226,14 @@ class MaestroApp(ctk.CTk):
             text="🔍 Analyze Video (Context)",
             command=self._analyze,
             height=36,
-            font=ctk.CTkFont(size=13),
+            font=self._font_body,
             fg_color="#166534",
             hover_color="#14532d"
         )
         # tooltips disabled
         # Start disabled until prerequisites are satisfied
         try:
-            self.btn_analyze.configure(state="disabled")
+            self._configure_if_changed(self.btn_analyze, state="disabled")
         except Exception:
             pass
 
@@ -141,16 +242,17 @@ class MaestroApp(ctk.CTk):
             text="🎭 Generate Shots",
             command=self._generate_shots_from_context,
             height=36,
-            font=ctk.CTkFont(size=13),
+            font=self._font_body,
             fg_color="#1d4ed8",
             hover_color="#1e40af"
         )
         # tooltips disabled
         # Start disabled until analysis finishes
         try:
-            self.btn_gen_all.configure(state="disabled")
+            self._configure_if_changed(self.btn_gen_all, state="disabled")
         except Exception:
             pass
+
         # Shot count selector (3-10)
         shot_row = ctk.CTkFrame(action_section, fg_color="transparent")
         shot_row.pack(fill="x", pady=(8, 4))
@@ -158,7 +260,7 @@ class MaestroApp(ctk.CTk):
         lbl_shots = ctk.CTkLabel(
             shot_row,
             text="Shots:",
-            font=ctk.CTkFont(size=12),
+            font=self._font_text,
             text_color=("gray60", "gray40")
         )
         lbl_shots.pack(side="left")
@@ -174,7 +276,7 @@ class MaestroApp(ctk.CTk):
 
         self.dd_shot_count = ctk.CTkOptionMenu(
             shot_row,
-            values=[str(n) for n in range(3, 11)],
+            values=list(SHOT_COUNT_VALUES),
             variable=self.var_shot_count,
             command=_on_shot_count_change,
             width=80,
@@ -191,24 +293,31 @@ class MaestroApp(ctk.CTk):
         lbl_text = ctk.CTkLabel(
             size_row,
             text="Text Size:",
-            font=ctk.CTkFont(size=12),
+            font=self._font_text,
             text_color=("gray60", "gray40"),
         )
         lbl_text.pack(side="left")
 
         self.var_text_scale = ctk.StringVar(value="100%")
+        def _apply_text_scale(pct: int) -> None:
+            self._scale_after_id = None
+            ctk.set_widget_scaling(pct / 100.0)
+            self._on_log(f"🔤 UI scale set to {pct}%")
+
         def _on_text_scale_change(choice: str) -> None:
+            # Rescaling re-lays out every widget; apply only the last choice of a burst
             try:
                 pct = int(choice.strip("%"))
                 pct = max(75, min(175, pct))
-                ctk.set_widget_scaling(pct / 100.0)
-                self._on_log(f"🔤 UI scale set to {pct}%")
+                if self._scale_after_id is not None:
+                    self.after_cancel(self._scale_after_id)
+                self._scale_after_id = self.after(UI_APPLY_DELAY_MS, lambda: _apply_text_scale(pct))
             except Exception:
                 pass
 
         self.dd_text_scale = ctk.CTkOptionMenu(
             size_row,
-            values=["90%", "100%", "110%", "125%", "150%"],
+            values=list(TEXT_SCALE_VALUES),
             variable=self.var_text_scale,
             command=_on_text_scale_change,
             width=100,
@@ -222,7 +331,7 @@ class MaestroApp(ctk.CTk):
         lbl_theme = ctk.CTkLabel(
             theme_row,
             text="Theme:",
-            font=ctk.CTkFont(size=12),
+            font=self._font_text,
             text_color=("gray60", "gray40"),
         )
         lbl_theme.pack(side="left")
@@ -233,7 +342,7 @@ class MaestroApp(ctk.CTk):
             text="Switch to Light",
             command=self._toggle_theme,
             height=28,
-            font=ctk.CTkFont(size=11),
+            font=self._font_small,
         )
         self.btn_theme_toggle.pack(side="right")
 
@@ -245,7 +354,7 @@ class MaestroApp(ctk.CTk):
         preview_label = ctk.CTkLabel(
             preview_section,
             text="📋 Previews",
-            font=ctk.CTkFont(size=13, weight="bold"),
+            font=self._font_body_bold,
             text_color=("gray60", "gray40")
         )
         preview_label.pack(anchor="w", pady=(0, 12))
@@ -257,7 +366,7 @@ class MaestroApp(ctk.CTk):
         self.lbl_video_preview = ctk.CTkLabel(
             video_preview_frame,
             text="📹 Video Preview",
-            font=ctk.CTkFont(size=11),
+            font=self._font_small,
             text_color=("gray50", "gray60"),
             height=80
         )
@@ -271,7 +380,7 @@ class MaestroApp(ctk.CTk):
         self.lbl_style_preview = ctk.CTkLabel(
             style_preview_frame,
             text="🎨 Style Preview",
-            font=ctk.CTkFont(size=11),
+            font=self._font_small,
             text_color=("gray50", "gray60"),
             height=80
         )
@@ -299,14 +408,14 @@ class MaestroApp(ctk.CTk):
         self.lbl_context = ctk.CTkLabel(
             context_header,
             text="📝 Context & Analysis",
-            font=ctk.CTkFont(size=16, weight="bold")
+            font=self._font_title
         )
         self.lbl_context.pack(anchor="w", side="left")
 
         self.lbl_wc = ctk.CTkLabel(
             context_header,
             text="0 words",
-            font=ctk.CTkFont(size=12),
+            font=self._font_text,
             text_color=("gray60", "gray40")
         )
         self.lbl_wc.pack(anchor="e", side="right")
@@ -315,11 +424,11 @@ class MaestroApp(ctk.CTk):
         self.txt_context = ctk.CTkTextbox(
             context_section,
             height=120,
-            font=ctk.CTkFont(size=12),
+            font=self._font_text,
             fg_color=("gray90", "gray20")
         )
         self.txt_context.pack(padx=0, pady=(12, 0), fill="x")
-        self.txt_context.bind("<KeyRelease>", lambda _e: self._update_word_count())
+        self.txt_context.bind("<KeyRelease>", lambda _e: self._schedule_word_count())
 
     def _build_shots_section(self) -> None:
         """Build the shots display section."""
@@ -329,7 +438,7 @@ class MaestroApp(ctk.CTk):
         self.shots_frame = ctk.CTkScrollableFrame(
             shots_section,
             label_text="🎬 Generated Shots",
-            label_font=ctk.CTkFont(size=14, weight="bold"),
+            label_font=self._font_heading,
             label_fg_color="transparent"
         )
         self.shots_frame.pack(fill="both", expand=True)
@@ -367,7 +476,7 @@ class MaestroApp(ctk.CTk):
         logs_label = ctk.CTkLabel(
             logs_header,
             text="📊 Activity Log",
-            font=ctk.CTkFont(size=14, weight="bold")
+            font=self._font_heading
         )
         logs_label.pack(anchor="w", side="left")
 
@@ -377,7 +486,7 @@ class MaestroApp(ctk.CTk):
             command=self._clear_logs,
             width=60,
             height=28,
-            font=ctk.CTkFont(size=10),
+            font=self._font_tiny,
             fg_color="transparent",
             text_color=("gray60", "gray40")
         )
@@ -388,7 +497,7 @@ class MaestroApp(ctk.CTk):
         self.txt_logs = ctk.CTkTextbox(
             logs_section,
             activate_scrollbars=True,
-            font=ctk.CTkFont(size=11),
+            font=self._font_small,
             fg_color=("gray90", "gray20")
         )
         self.txt_logs.pack(fill="both", expand=True, pady=(12, 0))
@@ -406,7 +515,7 @@ class MaestroApp(ctk.CTk):
             status_content,
             text="✨ Ready to create storyboards (Press F1 for help)",
             anchor="w",
-            font=ctk.CTkFont(size=12),
+            font=self._font_text,
             text_color=("gray50", "gray70")
         )
         self.lbl_status.pack(side="left")
@@ -417,31 +526,74 @@ class MaestroApp(ctk.CTk):
             status_content,
             text="🔌 Checking connection...",
             anchor="e",
-            font=ctk.CTkFont(size=11),
+            font=self._font_small,
             text_color=("gray60", "gray50")
         )
         self.lbl_connection_status.pack(side="right")
 
     # ---------- Events ----------
+    def _post_event(self, *evt) -> None:
+        """Queue `evt` for the Tk thread and wake it; safe to call from any thread."""
+        self.events.append(evt)
+        try:
+            self.event_generate(EVENT_WAKE, when="tail")
+        except Exception:  # noqa: BLE001 - window closing or mainloop not running yet; the fallback drain picks it up
+            pass
+
     def _on_log(self, msg: str) -> None:
-        self.app_state.logs.append(msg)
+        # Pipeline steps log from worker threads; Tk widgets may only be touched on the main thread
+        if threading.current_thread() is not threading.main_thread():
+            self._post_event("log", msg)
+            return
+        # Coalesce bursts: at most one textbox/status update per LOG_FLUSH_MS instead of one per line
+        self._log_buf.append(msg)
+        if not self._log_flush_pending:
+            self._log_flush_pending = True
+            self.after(LOG_FLUSH_MS, self._flush_logs)
+
+    def _flush_logs(self) -> None:
+        msgs, self._log_buf = self._log_buf, []
+        self._log_flush_pending = False
+        self._append_logs(msgs)
+
+    def _append_logs(self, msgs: list[str]) -> None:
+        """Write a batch of log lines with one textbox insert/scroll and one status update."""
+        if not msgs:
+            return
+        self.app_state.logs.extend(msgs)
         try:
-            self.txt_logs.insert("end", msg + os.linesep)
+            self.txt_logs.insert("end", "".join(m + os.linesep for m in msgs))
+            # Keep the textbox bounded like the in-memory history
+            excess = int(self.txt_logs.index("end-1c").split(".")[0]) - 1 - LOG_HISTORY_MAX
+            if excess > 0:
+                self.txt_logs.delete("1.0", f"{excess + 1}.0")
             self.txt_logs.see("end")
         except Exception:
             pass
-        self._set_status(msg)
+        self._set_status(msgs[-1])
 
     def _set_status(self, text: str) -> None:
+        if text == self._status_text:
+            return
         try:
             self.lbl_status.configure(text=text)
+            self._status_text = text
         except Exception:
             pass
 
+    def _schedule_word_count(self) -> None:
+        # Typing bursts collapse into one recount once keys pause for WORD_COUNT_DELAY_MS
+        if self._wc_after_id is not None:
+            self.after_cancel(self._wc_after_id)
+        self._wc_after_id = self.after(WORD_COUNT_DELAY_MS, self._update_word_count)
+
     def _update_word_count(self) -> None:
+        if self._wc_after_id is not None:
+            self.after_cancel(self._wc_after_id)
+            self._wc_after_id = None
         try:
-            txt = self.txt_context.get("1.0", "end").strip()
-            words = len([w for w in txt.split() if w])
+            # str.split() already drops empty runs of whitespace
+            words = len(self.txt_context.get("1.0", "end").split())
             self.lbl_wc.configure(text=f"{words} words")
         except Exception:
             pass
@@ -451,6 +603,7 @@ class MaestroApp(ctk.CTk):
         try:
             log_count = len(self.app_state.logs)
             self._on_log(f"🗑️ Clearing activity log ({log_count} entries)...")
+            self._flush_logs()
             self.txt_logs.delete("1.0", "end")
             self.app_state.logs.clear()
             self._on_log("✅ Activity log cleared successfully")
@@ -482,32 +635,68 @@ class MaestroApp(ctk.CTk):
     def _toggle_theme(self) -> None:
         try:
             self._theme_mode = "light" if self._theme_mode == "dark" else "dark"
-            ctk.set_appearance_mode(self._theme_mode)
             btn_text = "Switch to Dark" if self._theme_mode == "light" else "Switch to Light"
             try:
                 self.btn_theme_toggle.configure(text=btn_text)
             except Exception:
                 pass
+            # Repainting every widget is expensive; rapid clicks only repaint once, in the final mode
+            if self._theme_after_id is not None:
+                self.after_cancel(self._theme_after_id)
+            self._theme_after_id = self.after(UI_APPLY_DELAY_MS, self._apply_theme)
+        except Exception:
+            pass
+
+    def _apply_theme(self) -> None:
+        self._theme_after_id = None
+        try:
+            ctk.set_appearance_mode(self._theme_mode)
             self._on_log(f"🌓 Theme set to {self._theme_mode.title()}")
         except Exception:
             pass
 
-    def _refresh_action_buttons_state(self) -> None:
-        """Enable/disable Analyze and Generate based on prerequisites."""
+    def _refresh_action_buttons_state(
+        self,
+        *,
+        analyze_text: str | None = None,
+        gen_all_text: str | None = None,
+    ) -> None:
+        """Enable/disable Analyze and Generate based on prerequisites.
+
+        Optional labels are applied in the same `configure` call as the state. Both stay disabled
+        while an analysis or director run is in flight, whatever else changed meanwhile.
+        """
         try:
-            has_video = bool(self.app_state.video_bytes)
+            idle = not self._action_running
+            has_video = bool(self.app_state.video_path)
             has_style = bool(self.app_state.style_data_url)
             can_analyze = has_video and has_style
-            self.btn_analyze.configure(state="normal" if can_analyze else "disabled")
-
             analyzed = bool(self.app_state.context_text and self.app_state.middle_frame_data_url)
-            self.btn_gen_all.configure(state="normal" if analyzed else "disabled")
+            for btn, enabled, text in (
+                (self.btn_analyze, idle and can_analyze, analyze_text),
+                (self.btn_gen_all, idle and analyzed, gen_all_text),
+            ):
+                opts = {"state": "normal" if enabled else "disabled"}
+                if text is not None:
+                    opts["text"] = text
+                self._configure_if_changed(btn, **opts)
         except Exception:
             pass
 
+    def _configure_if_changed(self, widget: ctk.CTkBaseClass, **opts) -> None:
+        """`widget.configure(**opts)`, skipping options already applied through this helper.
+
+        Every CTk configure redraws the widget; the action buttons are refreshed after each
+        open/analyze/generate step, usually with the same state they already have.
+        """
+        applied = self._widget_opts.setdefault(str(widget), {})
+        changed = {k: v for k, v in opts.items() if applied.get(k) != v}
+        if changed:
+            widget.configure(**changed)
+            applied.update(changed)
+
     def _open_video(self) -> None:
         self._on_log("📹 Opening video file dialog...")
-        from tkinter.filedialog import askopenfilename
         path = askopenfilename(filetypes=[("Video", "*.mp4")])
         if not path:
             self._on_log("❌ Video selection cancelled")
@@ -515,25 +704,27 @@ class MaestroApp(ctk.CTk):
 
         self._on_log(f"📁 Selected video file: {os.path.basename(path)}")
         self.app_state.video_path = path
+        self.app_state.video_preview_data_url = None
         try:
-            self._on_log("📖 Reading video file...")
-            with open(path, "rb") as f:
-                self.app_state.video_bytes = f.read()
-            file_size = len(self.app_state.video_bytes)
+            # Decoders read the file directly; no in-memory copy of the whole video
+            file_size = os.path.getsize(path)
             self._on_log(f"✅ Video loaded successfully: {os.path.basename(path)} ({file_size:,} bytes)")
-
-            # Build and show middle-frame preview
-            self._on_log("🖼️  Generating video preview...")
-            try:
-                data_url = sample_middle_frame_as_data_url(self.app_state.video_bytes)
-                cimg = data_url_to_ctkimage(data_url, max_width=150)
-                self.lbl_video_preview.configure(image=cimg, text="")
-                self.lbl_video_preview._image_ref = cimg  # type: ignore[attr-defined]
-                self._on_log("✅ Video preview generated successfully")
-            except Exception as e:  # noqa: BLE001
-                self._on_log(f"⚠️  Video preview failed: {e}")
         except Exception as e:
             self._on_log(f"❌ Failed to load video: {e}")
+        else:
+            # Decode the preview frame off the Tk thread; the label is updated on "video_preview"
+            self._on_log("🖼️  Generating video preview...")
+
+            def worker() -> None:
+                try:
+                    from src.services.video import sample_middle_frame_as_data_url
+                    data_url = sample_middle_frame_as_data_url(path)
+                    img = data_url_to_preview_pil(data_url, max_width=150)
+                    self._post_event("video_preview", path, data_url, img)
+                except Exception as e:  # noqa: BLE001
+                    self._on_log(f"⚠️  Video preview failed: {e}")
+
+            self._io_executor.submit(worker)
         # Update action buttons availability
         try:
             self._refresh_action_buttons_state()
@@ -542,7 +733,6 @@ class MaestroApp(ctk.CTk):
 
     def _open_style(self) -> None:
         self._on_log("🎨 Opening style image file dialog...")
-        from tkinter.filedialog import askopenfilename
         path = askopenfilename(filetypes=[("Images", "*.png;*.jpg;*.jpeg")])
         if not path:
             self._on_log("❌ Style image selection cancelled")
@@ -550,29 +740,24 @@ class MaestroApp(ctk.CTk):
 
         self._on_log(f"📁 Selected style image: {os.path.basename(path)}")
         self.app_state.style_path = path
-        try:
-            self._on_log("📖 Reading style image file...")
-            with open(path, "rb") as f:
-                b = f.read()
-            file_size = len(b)
-            self._on_log(f"📊 Style image loaded: {file_size:,} bytes")
-
-            self._on_log("🖼️  Building style preview...")
-            self.app_state.style_data_url = self.pipeline.build_style_preview(b)
-
-            self._on_log(f"✅ Style image processed successfully: {os.path.basename(path)}")
+        # Generation stays disabled until the new style reference is ready
+        self.app_state.style_data_url = ""
 
-            # Show style preview
-            self._on_log("🖼️  Generating style preview display...")
+        def worker() -> None:
             try:
-                cimg = data_url_to_ctkimage(self.app_state.style_data_url, max_width=150)
-                self.lbl_style_preview.configure(image=cimg, text="")
-                self.lbl_style_preview._image_ref = cimg  # type: ignore[attr-defined]
-                self._on_log("✅ Style preview displayed successfully")
+                self._on_log("📖 Reading style image file...")
+                with open(path, "rb") as f:
+                    b = f.read()
+                self._on_log(f"📊 Style image loaded: {len(b):,} bytes")
+
+                self._on_log("🖼️  Building style preview...")
+                data_url = self.pipeline.build_style_preview(b)
+                img = data_url_to_preview_pil(data_url, max_width=150)
+                self._post_event("style_loaded", path, data_url, img)
             except Exception as e:  # noqa: BLE001
-                self._on_log(f"⚠️  Style preview display failed: {e}")
-        except Exception as e:
-            self._on_log(f"❌ Failed to load style image: {e}")
+                self._on_log(f"❌ Failed to load style image: {e}")
+
+        self._io_executor.submit(worker)
         # Update action buttons availability
         try:
             self._refresh_action_buttons_state()
@@ -581,16 +766,23 @@ class MaestroApp(ctk.CTk):
 
     def _analyze(self) -> None:
         self._on_log("🎬 Analyzing video for context...")
-        if not self.app_state.video_bytes:
+        video_path = self.app_state.video_path
+        if not video_path:
             self._on_log("❌ No video loaded - analysis cancelled")
             self.show_toast("📹 Please select a video first", duration_ms=3000)
             return
 
-        self._on_log(f"📊 Video size: {len(self.app_state.video_bytes)} bytes")
+        try:
+            self._on_log(f"📊 Video size: {os.path.getsize(video_path)} bytes")
+        except OSError as e:
+            self._on_log(f"❌ Video file unavailable: {e}")
+            self.show_toast("📹 Video file is no longer available", duration_ms=3000)
+            return
 
         # Update UI state
-        self.btn_analyze.configure(state="disabled", text="🔄 Analyzing...")
-        self.btn_gen_all.configure(state="disabled")
+        self._action_running = True
+        self._configure_if_changed(self.btn_analyze, state="disabled", text="🔄 Analyzing...")
+        self._configure_if_changed(self.btn_gen_all, state="disabled")
 
         # Enhanced progress feedback
         try:
@@ -603,187 +795,310 @@ class MaestroApp(ctk.CTk):
         self._set_status("🔍 Getting context from video...")
         self.show_toast("🧠 Analyzing context", duration_ms=2000)
         self._on_log("🔄 UI updated, starting analysis thread...")
+        # A repeat click on the same video means the user wants a new description, not the memoized one
+        use_cache = video_path != self._analyzed_video
+        self._analyzed_video = video_path
+        # Snapshot with video_path: opening another video before the worker runs must not pair
+        # this video's frames with the new video's preview
+        middle_frame_data_url = self.app_state.video_preview_data_url
 
         def worker() -> None:
             self._on_log("🧵 Context analysis worker started")
             try:
-                ctx, middle = self.pipeline.analyze_context(self.app_state.video_bytes or b"", cancel=self.app_state.cancel_event)
+                ctx, middle = self.pipeline.analyze_context(
+                    video_path,
+                    cancel=self.app_state.cancel_event,
+                    middle_frame_data_url=middle_frame_data_url,
+                    use_cache=use_cache,
+                )
                 self._on_log("✅ Context analysis completed successfully")
-                self.events.put(("context_done", ctx, middle))
+                self._post_event("context_done", ctx, middle)
             except Exception as e:  # noqa: BLE001
                 self._on_log(f"❌ Context analysis failed with exception: {e}")
-                self.events.put(("error", str(e)))
+                self._post_event("error", str(e))
 
-        threading.Thread(target=worker, daemon=True).start()
+        self._executor.submit(worker)
 
     # Cancel functionality removed
 
+    def _drain_fallback(self) -> None:
+        self._drain_events()
+        self.after(DRAIN_FALLBACK_MS, self._drain_fallback)
+
     def _drain_events(self) -> None:
-        try:
-            while True:
-                evt = self.events.get_nowait()
-                kind = evt[0]
-                if kind == "context_done":
-                    _k, ctx, middle = evt
-                    self._on_log(f"📝 Context received: {len(ctx)} chars. Middle frame ready.")
-                    self.app_state.context_text = ctx
-                    self.app_state.middle_frame_data_url = middle
-                    self.txt_context.delete("1.0", "end")
-                    self.txt_context.insert("1.0", ctx)
-                    self._update_word_count()
-
-                    # Reset UI state; enable Generate Shots
-                    self.btn_analyze.configure(state="normal", text="🔍 Analyze Video (Context)")
-                    # Cancel button removed
-                    self._refresh_action_buttons_state()
+        # Single consumer: a non-empty check cannot race with popleft
+        batch = []
+        while self.events:
+            batch.append(self.events.popleft())
+        # A burst of upscales for one shot only needs its newest preview rendered
+        newest = {evt[1]: i for i, evt in enumerate(batch) if evt[0] == "auto_upscaled"}
+        for i, evt in enumerate(batch):
+            if evt[0] == "auto_upscaled" and newest[evt[1]] != i:
+                self._on_log(f"💾 Autosaved upscaled shot {evt[1]} → {os.path.basename(evt[-1])}")
+                continue
+            try:
+                self._handle_event(evt)
+            except Exception as e:  # noqa: BLE001 - keep handling the rest of the batch
+                self._on_log(f"⚠️  Failed to handle {evt[0]} event: {e}")
+
+    def _handle_event(self, evt: tuple) -> None:
+        kind = evt[0]
+        if kind == "log":
+            self._on_log(evt[1])
+        elif kind == "video_preview":
+            _k, path, data_url, img = evt
+            if path != self.app_state.video_path:
+                return  # a different video was selected meanwhile
+            self.app_state.video_preview_data_url = data_url
+            try:
+                cimg = pil_to_ctkimage(img)
+                self.lbl_video_preview.configure(image=cimg, text="")
+                self.lbl_video_preview._image_ref = cimg  # type: ignore[attr-defined]
+                self._on_log("✅ Video preview generated successfully")
+            except Exception as e:  # noqa: BLE001
+                self._on_log(f"⚠️  Video preview failed: {e}")
+        elif kind == "style_loaded":
+            _k, path, data_url, img = evt
+            if path != self.app_state.style_path:
+                return  # a different style image was selected meanwhile
+            self.app_state.style_data_url = data_url
+            self._on_log(f"✅ Style image processed successfully: {os.path.basename(path)}")
+            try:
+                cimg = pil_to_ctkimage(img)
+                self.lbl_style_preview.configure(image=cimg, text="")
+                self.lbl_style_preview._image_ref = cimg  # type: ignore[attr-defined]
+                self._on_log("✅ Style preview displayed successfully")
+            except Exception as e:  # noqa: BLE001
+                self._on_log(f"⚠️  Style preview display failed: {e}")
+            self._refresh_action_buttons_state()
+        elif kind == "context_done":
+            _k, ctx, middle = evt
+            self._on_log(f"📝 Context received: {len(ctx)} chars. Middle frame ready.")
+            self.app_state.context_text = ctx
+            self.app_state.middle_frame_data_url = middle
+            self.txt_context.delete("1.0", "end")
+            self.txt_context.insert("1.0", ctx)
+            self._update_word_count()
+
+            # Reset UI state; enable Generate Shots
+            self._action_running = False
+            self._refresh_action_buttons_state(analyze_text="🔍 Analyze Video (Context)")
 
-                    try:
-                        self.progress.stop()
-                        self.progress.configure(progress_color="#4CAF50")
-                    except Exception:
-                        pass
+            try:
+                self.progress.stop()
+                self.progress.configure(progress_color="#4CAF50")
+            except Exception:
+                pass
 
-                    self._set_status("✅ Context ready. You can edit it, then Generate Shots.")
-                    self.show_toast("🧠 Context ready. Edit if needed, then press Generate Shots.", duration_ms=3000)
-                elif kind == "error":
-                    _k, msg = evt
-                    self._on_log(f"🚨 Critical error occurred: {msg}")
-                    self._on_log("🔄 Resetting UI state after error...")
+            self._set_status("✅ Context ready. You can edit it, then Generate Shots.")
+            self.show_toast("🧠 Context ready. Edit if needed, then press Generate Shots.", duration_ms=3000)
+        elif kind == "error":
+            _k, msg = evt
+            self._on_log(f"🚨 Critical error occurred: {msg}")
+            self._on_log("🔄 Resetting UI state after error...")
 
-                    # Reset UI state
-                    self.btn_analyze.configure(state="normal", text="🔍 Analyze Video")
-                    # Cancel button removed
-                    self._refresh_action_buttons_state()
+            # Reset UI state (this also covers a failed Generate Shots run)
+            self._action_running = False
+            self._refresh_action_buttons_state(analyze_text="🔍 Analyze Video", gen_all_text="🎭 Generate Shots")
 
-                    try:
-                        self.progress.stop()
-                        self._on_log("✅ Progress indicator stopped")
-                    except Exception as progress_error:  # noqa: BLE001
-                        self._on_log(f"⚠️ Failed to stop progress indicator: {progress_error}")
+            try:
+                self.progress.stop()
+                self._on_log("✅ Progress indicator stopped")
+            except Exception as progress_error:  # noqa: BLE001
+                self._on_log(f"⚠️ Failed to stop progress indicator: {progress_error}")
 
-                    self._on_log("✅ UI state reset complete after error")
-                    try:
-                        self.progress.configure(progress_color="#ef4444")
-                    except Exception:
-                        pass
+            self._on_log("✅ UI state reset complete after error")
+            try:
+                self.progress.configure(progress_color="#ef4444")
+            except Exception:
+                pass
 
-                    self._set_status("❌ Analysis failed")
-                    self.show_toast("Something went wrong. Check the log for details.", duration_ms=4000)
-                elif kind == "conn_check":
-                    _k, ok, msg = evt
-                    status_icon = "✅" if ok else "❌"
-                    status_color = ("green", "lightgreen") if ok else ("red", "darkred")
-                    try:
-                        self.lbl_connection_status.configure(
-                            text=f"{status_icon} {msg}",
-                            text_color=status_color
-                        )
-                    except Exception:
-                        pass
-                elif kind == "gen_done":
-                    _k, shot_id, url = evt
-                    # Persist result
-                    self.app_state.results[shot_id] = url
-                    # Update UI widgets for this shot
-                    widgets = self.shot_widgets.get(shot_id)
-                    if widgets:
-                        prev = widgets.get("preview")
-                        if prev is not None and hasattr(prev, "set_preview"):
-                            try:
-                                prev.set_preview(url)  # type: ignore[attr-defined]
-                            except Exception:
-                                pass
-                        btn_save = widgets.get("btn_save")
-                        status_indicator = widgets.get("status_indicator")
-                        if btn_save:
-                            btn_save.configure(state="disabled")
-                        if status_indicator:
-                            status_indicator.configure(text="⏳ Processing...", text_color="#f59e0b")
-                    # Auto-upscale asynchronously
-                    def _auto_upscale_worker(sid: int, data_url: str) -> None:
-                        try:
-                            from src.services.storage import data_url_to_bytes_and_mime, bytes_to_data_url, save_data_url_png_to_dir
-                            from src.services.upscaler import get_upscaler
-                            raw, _ = data_url_to_bytes_and_mime(data_url)
-                            up_bytes = get_upscaler().upscale_from_bytes(raw, outscale=2.0, output_format="PNG")
-                            up_url = bytes_to_data_url(up_bytes, mime="image/png")
-                            # Autosave to output/
-                            root_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
-                            out_dir = os.path.join(root_dir, "output")
-                            saved_path = save_data_url_png_to_dir(up_url, out_dir, prefix=f"storyboard_shot_{sid:03d}")
-                            self.events.put(("auto_upscaled", sid, up_url, up_bytes, saved_path))
-                        except Exception as e:  # noqa: BLE001
-                            self.events.put(("upscale_error", sid, str(e)))
-                    threading.Thread(target=_auto_upscale_worker, args=(shot_id, url), daemon=True).start()
-                    btn_gen = widgets.get("btn_gen")
-                    if btn_gen:
-                        btn_gen.configure(state="normal", text="🎨 Generate Image")
-                    self._on_log(f"Shot {shot_id} generated")
-                    self.show_toast(f"🎬 Shot {shot_id} complete!", duration_ms=2000)
-                elif kind == "gen_error":
-                    _k, shot_id, msg = evt
-                    self._on_log(f"Shot {shot_id} failed: {msg}")
-                    self.app_state.errors[shot_id] = msg
-                    widgets = self.shot_widgets.get(shot_id)
-                    if widgets:
-                        status_indicator = widgets.get("status_indicator")
-                        btn_gen = widgets.get("btn_gen")
-                        if status_indicator:
-                            status_indicator.configure(text="❌ Failed", text_color="#ef4444")
-                        if btn_gen:
-                            btn_gen.configure(state="normal", text="🔄 Retry")
-                    self.show_toast(f"❌ Shot {shot_id} failed. Check log for details.", duration_ms=3000)
-                elif kind == "shots_done":
-                    _k, shots = evt
-                    self.app_state.shots = shots
-                    self._render_shots()
+            self._set_status("❌ Analysis failed")
+            self.show_toast("Something went wrong. Check the log for details.", duration_ms=4000)
+        elif kind == "conn_check":
+            _k, ok, msg = evt
+            status_icon = "✅" if ok else "❌"
+            status_color = ("green", "lightgreen") if ok else ("red", "darkred")
+            try:
+                self.lbl_connection_status.configure(
+                    text=f"{status_icon} {msg}",
+                    text_color=status_color
+                )
+            except Exception:
+                pass
+        elif kind == "conn_test":
+            _k, lbl_test, btn_test, msg = evt
+            self._on_log(f"Connectivity: {msg}")
+            try:
+                # The settings window may have been closed while the probes ran
+                if lbl_test.winfo_exists():
+                    lbl_test.configure(text=msg)
+                    btn_test.configure(state="normal")
+            except Exception:
+                pass
+        elif kind == "gen_done":
+            _k, shot_id, url, raw, thumb = evt
+            self.app_state.in_progress[shot_id] = False
+            # Update UI widgets for this shot; one lookup, and a missing row is not an error
+            widgets = self.shot_widgets.get(shot_id) or {}
+            set_preview = widgets.get("set_preview")
+            btn_save = widgets.get("btn_save")
+            status_indicator = widgets.get("status_indicator")
+            btn_gen = widgets.get("btn_gen")
+            if set_preview:
+                try:
+                    set_preview(url, raw=raw, thumb=thumb)
+                except Exception:
+                    pass
+            if btn_save:
+                btn_save.configure(state="disabled")
+            if status_indicator:
+                status_indicator.configure(text="⏳ Processing...", text_color="#f59e0b")
+            if btn_gen:
+                btn_gen.configure(state="normal", text="🎨 Generate Image")
+            # Auto-upscale asynchronously
+            self._upscale_executor.submit(self._auto_upscale_worker, shot_id, url, raw)
+            self._on_log(f"Shot {shot_id} generated")
+            self.show_toast(f"🎬 Shot {shot_id} complete!", duration_ms=2000)
+        elif kind == "gen_error":
+            _k, shot_id, msg = evt
+            self._on_log(f"Shot {shot_id} failed: {msg}")
+            self.app_state.errors[shot_id] = msg
+            self.app_state.in_progress[shot_id] = False
+            widgets = self.shot_widgets.get(shot_id)
+            if widgets:
+                status_indicator = widgets.get("status_indicator")
+                btn_gen = widgets.get("btn_gen")
+                if status_indicator:
+                    status_indicator.configure(text="❌ Failed", text_color="#ef4444")
+                if btn_gen:
+                    btn_gen.configure(state="normal", text="🔄 Retry")
+            self.show_toast(f"❌ Shot {shot_id} failed. Check log for details.", duration_ms=3000)
+        elif kind == "shots_done":
+            _k, shots = evt
+            self.app_state.shots = shots
+            self._render_shots()
+            try:
+                self.progress.stop()
+                self.progress.configure(progress_color="#4CAF50")
+            except Exception:
+                pass
+            self._action_running = False
+            self._refresh_action_buttons_state(gen_all_text="🎭 Generate Shots")
+            self._set_status("✅ Shots ready. Generate images per shot or all.")
+            self.show_toast(f"🎬 {len(shots)} shots generated.", duration_ms=3000)
+        elif kind == "auto_upscaled":
+            _k, shot_id, up_bytes, thumb, saved_path = evt
+            self.app_state.saved_paths[shot_id] = saved_path
+            widgets = self.shot_widgets.get(shot_id)
+            if widgets:
+                set_preview = widgets.get("set_preview")
+                status_indicator = widgets.get("status_indicator")
+                btn_save = widgets.get("btn_save")
+                if set_preview:
                     try:
-                        self.progress.stop()
-                        self.progress.configure(progress_color="#4CAF50")
+                        set_preview(None, indicator=status_indicator, on_click_path=saved_path, raw=up_bytes, thumb=thumb)
                     except Exception:
                         pass
-                    self.btn_gen_all.configure(state="normal", text="🎭 Generate Shots")
-                    self.btn_analyze.configure(state="normal")
-                    self._set_status("✅ Shots ready. Generate images per shot or all.")
-                    self.show_toast(f"🎬 {len(shots)} shots generated.", duration_ms=3000)
-                elif kind == "auto_upscaled":
-                    _k, shot_id, up_url, up_bytes, saved_path = evt
-                    self.app_state.upscaled[shot_id] = up_bytes
-                    self.app_state.saved_paths[shot_id] = saved_path
-                    widgets = self.shot_widgets.get(shot_id)
-                    if widgets:
-                        prev = widgets.get("preview")
-                        status_indicator = widgets.get("status_indicator")
-                        btn_save = widgets.get("btn_save")
-                        if prev is not None and hasattr(prev, "set_preview"):
-                            try:
-                                prev.set_preview(up_url, indicator=status_indicator, on_click_path=saved_path)  # type: ignore[attr-defined]
-                            except Exception:
-                                pass
-                        if btn_save:
-                            btn_save.configure(state="normal")
-                    self._on_log(f"💾 Autosaved upscaled shot {shot_id} → {os.path.basename(saved_path)}")
-                    self.show_toast(f"💾 Saved shot {shot_id}")
-        except queue.Empty:
-            pass
-        self.after(50, self._drain_events)
+                if btn_save:
+                    btn_save.configure(state="normal")
+            self._on_log(f"💾 Autosaved upscaled shot {shot_id} → {os.path.basename(saved_path)}")
+            self.show_toast(f"💾 Saved shot {shot_id}")
+        elif kind == "save_done":
+            _k, shot_id, path, data_size, err = evt
+            if err is None:
+                self._on_log(f"✅ Saved upscaled for shot {shot_id}: {os.path.basename(path)} ({data_size:,} bytes)")
+                self.show_toast(f"💾 Saved shot {shot_id}")
+            else:
+                self._on_log(f"❌ Save failed for shot {shot_id}: {err}")
+                self.show_toast(f"❌ Save failed for shot {shot_id}", duration_ms=3000)
+        elif kind == "upscale_error":
+            _k, shot_id, msg = evt
+            self._on_log(f"⚠️  Upscale failed for shot {shot_id}: {msg}")
+            widgets = self.shot_widgets.get(shot_id) or {}
+            status_indicator = widgets.get("status_indicator")
+            if status_indicator:
+                status_indicator.configure(text="⚠️ Not upscaled", text_color="#f59e0b")
+
+    def _auto_upscale_worker(self, sid: int, data_url: str, raw: bytes | None) -> None:
+        try:
+            if raw is None:
+                raw, _ = data_url_to_bytes_and_mime(data_url)
+            up_bytes = _get_upscaler().upscale_from_bytes(raw, outscale=2.0, output_format="PNG")
+            # Autosave the PNG bytes to output/ as-is
+            saved_path = save_bytes_to_dir(up_bytes, OUTPUT_DIR, prefix=f"storyboard_shot_{sid:03d}")
+            try:
+                thumb = bytes_to_preview_pil(up_bytes, max_width=SHOT_PREVIEW_WIDTH)
+            except Exception:  # noqa: BLE001 - set_preview decodes up_bytes itself
+                thumb = None
+            self._post_event("auto_upscaled", sid, up_bytes, thumb, saved_path)
+        except Exception as e:  # noqa: BLE001
+            self._post_event("upscale_error", sid, str(e))
 
     # ---------- Rendering ----------
     def _render_shots(self) -> None:
-        """Render all shots in the shots frame."""
-        for child in self.shots_frame.winfo_children():
-            child.destroy()
-        self.shot_widgets: dict[int, dict[str, ctk.CTkBaseClass]] = {}
-
-        for shot in self.app_state.shots:
-            shot_widgets = self._create_shot_widget(shot)
-            self.shot_widgets[shot.id] = shot_widgets
+        """Render all shots in the shots frame.
+
+        Rows are keyed by shot id: existing rows are reset and reused, only new ids build widgets.
+        """
+        shots = self.app_state.shots
+        order = [shot.id for shot in shots]
+        keep = set(order)
+        for sid in [sid for sid in self.shot_widgets if sid not in keep]:
+            self.shot_widgets.pop(sid)["container"].destroy()
+
+        new_rows = []
+        for shot in shots:
+            widgets = self.shot_widgets.get(shot.id)
+            if widgets is None:
+                widgets = self._create_shot_widget(shot)
+                self.shot_widgets[shot.id] = widgets
+                new_rows.append(widgets)
+                if self.app_state.in_progress.get(shot.id):
+                    # Row dropped and re-added while its generation runs: keep it locked until that finishes
+                    widgets["status_indicator"].configure(text="🎨 Creating...", text_color="#f59e0b")
+                    widgets["btn_gen"].configure(state="disabled", text="⏳ Generating...")
+            else:
+                self._reset_shot_widget(widgets, shot)
+
+        # New rows are built unmapped and packed together here, so the scrollable frame
+        # re-lays out once for the whole batch rather than once per row
+        if list(self.shot_widgets) != order:
+            # Re-pack in shot order; new rows were appended after the reused ones
+            self.shot_widgets = {sid: self.shot_widgets[sid] for sid in order}
+            for widgets in self.shot_widgets.values():
+                widgets["container"].pack_forget()
+            new_rows = list(self.shot_widgets.values())
+        for widgets in new_rows:
+            widgets["container"].pack(fill="x", padx=12, pady=8)
+
+    def _reset_shot_widget(self, widgets: dict, shot) -> None:
+        """Put a reused shot row back into the state of a freshly created one."""
+        txt = widgets["txt"]
+        txt.delete("1.0", "end")
+        txt.insert("1.0", shot.text)
+        if self.app_state.in_progress.get(shot.id):
+            # A generation for this shot id is still in flight; its gen_done/gen_error re-enables the row
+            widgets["status_indicator"].configure(text="🎨 Creating...", text_color="#f59e0b")
+            widgets["btn_gen"].configure(state="disabled", text="⏳ Generating...")
+        else:
+            widgets["status_indicator"].configure(text="⏳ Ready", text_color=("gray60", "gray40"))
+            widgets["btn_gen"].configure(state="normal", text="🎨 Generate Image")
+        widgets["btn_save"].configure(state="disabled")
+        preview = widgets["preview"]
+        if preview._image_ref is not None:  # type: ignore[attr-defined]
+            # CTkLabel cannot drop an image once set; swap in a blank label instead
+            frame = preview.master
+            preview.destroy()
+            preview = self._create_preview_label(frame)
+            widgets["preview"] = preview
+            widgets["set_preview"] = preview.set_preview  # type: ignore[attr-defined]
 
     def _create_shot_widget(self, shot) -> dict[str, ctk.CTkBaseClass]:
         """Create a single shot widget and return its components."""
         # Create shot container with improved styling
+        # Packed by _render_shots once the row is complete
         shot_container = ctk.CTkFrame(self.shots_frame, fg_color=("gray90", "gray25"))
-        shot_container.pack(fill="x", padx=12, pady=8)
 
         # Shot header with number and status
         header_frame = ctk.CTkFrame(shot_container, fg_color="transparent")
@@ -792,7 +1107,7 @@ class MaestroApp(ctk.CTk):
         shot_title = ctk.CTkLabel(
             header_frame,
             text=f"🎬 Shot {shot.id}",
-            font=ctk.CTkFont(size=14, weight="bold")
+            font=self._font_heading
         )
         shot_title.pack(anchor="w", side="left")
 
@@ -800,7 +1115,7 @@ class MaestroApp(ctk.CTk):
         status_indicator = ctk.CTkLabel(
             header_frame,
             text="⏳ Ready",
-            font=ctk.CTkFont(size=12),
+            font=self._font_text,
             text_color=("gray60", "gray40")
         )
         status_indicator.pack(anchor="e", side="right")
@@ -817,7 +1132,7 @@ class MaestroApp(ctk.CTk):
             left_section,
             height=160,
             width=360,
-            font=ctk.CTkFont(size=12)
+            font=self._font_text
         )
         txt.insert("1.0", shot.text)
 
@@ -826,7 +1141,7 @@ class MaestroApp(ctk.CTk):
             text="🎨 Generate Image",
             command=lambda s=shot, t_ref=txt: self._generate_one(s.id, t_ref),
             height=36,
-            font=ctk.CTkFont(size=13),
+            font=self._font_body,
             fg_color="#1d4ed8",
             hover_color="#1e40af"
         )
@@ -850,6 +1165,8 @@ class MaestroApp(ctk.CTk):
             "txt": txt,
             "btn_gen": btn_gen,
             "preview": preview,
+            # Bound once here so event handlers call it without a per-event hasattr probe
+            "set_preview": getattr(preview, "set_preview", None),
             "btn_save": action_buttons["btn_save"],
             "status_indicator": status_indicator,
         }
@@ -861,20 +1178,26 @@ class MaestroApp(ctk.CTk):
 
         preview_frame.grid_columnconfigure(0, weight=1)
         preview_frame.grid_rowconfigure(0, weight=1)
+        return self._create_preview_label(preview_frame)
 
+    def _create_preview_label(self, preview_frame) -> ctk.CTkLabel:
         preview = ctk.CTkLabel(
             preview_frame,
             text="📷 No preview",
-            font=ctk.CTkFont(size=12),
+            font=self._font_text,
             text_color=("gray50", "gray60")
         )
         preview.grid(row=0, column=0, sticky="nsew")
 
         # Setup preview callback
         preview._image_ref = None  # type: ignore[attr-defined]
-        def set_preview(data_url: str, widget=preview, indicator=None, on_click_path: str | None = None) -> None:
+        def set_preview(data_url: str | None, widget=preview, indicator=None, on_click_path: str | None = None, raw: bytes | None = None, thumb=None) -> None:
             try:
-                cimg = data_url_to_ctkimage(data_url, max_width=150)
+                # Workers pass a ready thumbnail; only the CTkImage wrap happens here on the Tk thread
+                if thumb is not None:
+                    cimg = pil_to_ctkimage(thumb)
+                else:
+                    cimg = self._preview_image(data_url, raw, max_width=SHOT_PREVIEW_WIDTH)
                 widget.configure(image=cimg, text="")
                 widget._image_ref = cimg  # type: ignore[attr-defined]
                 if indicator:
@@ -883,7 +1206,6 @@ class MaestroApp(ctk.CTk):
                 def _on_click(_e=None, path=on_click_path):
                     if path:
                         try:
-                            import subprocess, os, sys
                             if sys.platform.startswith("win"):
                                 os.startfile(path)  # type: ignore[attr-defined]
                             elif sys.platform == "darwin":
@@ -902,6 +1224,10 @@ class MaestroApp(ctk.CTk):
 
         return preview
 
+    def _preview_image(self, data_url: str | None, raw: bytes | None, *, max_width: int) -> ctk.CTkImage:
+        """Thumbnail for a shot preview; both converters reuse images they already built."""
+        return bytes_to_ctkimage(raw, max_width=max_width) if raw else data_url_to_ctkimage(data_url, max_width=max_width)
+
     def _create_action_buttons(self, parent, shot_id: int, status_indicator) -> dict[str, ctk.CTkButton]:
         """Create action buttons for a shot."""
         actions_frame = ctk.CTkFrame(parent, fg_color="transparent")
@@ -913,7 +1239,7 @@ class MaestroApp(ctk.CTk):
             state="disabled",
             command=lambda sid=shot_id: self._save_original(sid),
             height=32,
-            font=ctk.CTkFont(size=11),
+            font=self._font_small,
             fg_color="#166534",
             hover_color="#14532d"
         )
@@ -942,75 +1268,46 @@ class MaestroApp(ctk.CTk):
             if status_indicator:
                 status_indicator.configure(text="🎨 Creating...", text_color="#f59e0b")
 
+        # Read the edited text once, here on the Tk thread; the worker only gets the string
+        text_val = txt_widget.get("1.0", "end").strip()
         self.app_state.in_progress[shot_id] = True
-        self._on_log(f"🔄 UI updated for shot {shot_id}, starting generation thread...")
+        self._on_log(f"🔄 UI updated for shot {shot_id}, starting generation...")
+        text_preview = text_val[:30] + "..." if len(text_val) > 30 else text_val
+        self._on_log(f"📝 Shot {shot_id} text: '{text_preview}'")
+        try:
+            # Queued straight onto the image pool; no app worker sits waiting on the request
+            future = self.pipeline.submit_one(self.app_state.style_data_url, text_val)
+        except Exception as e:  # noqa: BLE001
+            self._on_log(f"❌ Generation failed for shot {shot_id}: {e}")
+            self._post_event("gen_error", shot_id, str(e))
+            return
 
-        def worker() -> None:
-            self._on_log(f"🧵 Generation worker thread started for shot {shot_id}")
+        def on_done(f) -> None:
             try:
-                text_val = txt_widget.get("1.0", "end").strip()
-                text_preview = text_val[:30] + "..." if len(text_val) > 30 else text_val
-                self._on_log(f"📝 Shot {shot_id} text: '{text_preview}'")
-                url = self.pipeline.generate_one(self.app_state.style_data_url, text_val)
-                self._on_log(f"✅ Generation completed successfully for shot {shot_id}")
-                self.events.put(("gen_done", shot_id, url))
+                url = f.result()
             except Exception as e:  # noqa: BLE001
                 self._on_log(f"❌ Generation failed for shot {shot_id}: {e}")
-                self.events.put(("gen_error", shot_id, str(e)))
-
-        threading.Thread(target=worker, daemon=True).start()
-
-        # register event handling
-        def on_event() -> None:
+                self._post_event("gen_error", shot_id, str(e))
+                return
+            self._on_log(f"✅ Generation completed successfully for shot {shot_id}")
+            # Decode + thumbnail on the IO pool so the image pool slot frees up for the next request
             try:
-                updated = False
-                while True:
-                    evt = self.events.get_nowait()
-                    kind = evt[0]
-                    if kind == "gen_done" and evt[1] == shot_id:
-                        _k, _sid, url = evt
-                        self.app_state.results[shot_id] = url
-                        widgets = self.shot_widgets.get(shot_id)
-                        if widgets:
-                            prev = widgets.get("preview")
-                            if prev is not None and hasattr(prev, "set_preview"):
-                                prev.set_preview(url)  # type: ignore[attr-defined]
-                            btn_save = widgets.get("btn_save")
-                            status_indicator = widgets.get("status_indicator")
-                            if btn_save: btn_save.configure(state="disabled")
-                            if status_indicator:
-                                status_indicator.configure(text="⏳ Processing...", text_color="#f59e0b")
-
-                        # Reset generate button
-                        btn_gen = widgets.get("btn_gen")
-                        if btn_gen:
-                            btn_gen.configure(state="normal", text="🎨 Generate Image")
-
-                        self._on_log(f"Shot {shot_id} generated")
-                        self.show_toast(f"🎬 Shot {shot_id} complete!", duration_ms=2000)
-                        self.app_state.in_progress[shot_id] = False
-                        updated = True
-                    elif kind == "gen_error" and evt[1] == shot_id:
-                        _k, _sid, msg = evt
-                        self._on_log(f"Shot {shot_id} failed: {msg}")
-                        self.app_state.errors[shot_id] = msg
-                        widgets = self.shot_widgets.get(shot_id)
-                        if widgets:
-                            status_indicator = widgets.get("status_indicator")
-                            btn_gen = widgets.get("btn_gen")
-                            if status_indicator:
-                                status_indicator.configure(text="❌ Failed", text_color="#ef4444")
-                            if btn_gen:
-                                btn_gen.configure(state="normal", text="🔄 Retry")
-                        self.app_state.in_progress[shot_id] = False
-                        self.show_toast(f"❌ Shot {shot_id} failed. Check log for details.", duration_ms=3000)
-                        updated = True
-                if updated:
-                    self.update_idletasks()
-            except queue.Empty:
-                pass
+                self._io_executor.submit(self._post_generated, shot_id, url)
+            except RuntimeError:
+                pass  # window closed while the request was in flight
 
-        self.after(50, on_event)
+        # Completion and errors arrive through _drain_events like every other worker
+        future.add_done_callback(on_done)
+
+    def _post_generated(self, shot_id: int, url: str) -> None:
+        """Queue a gen_done event, decoding and thumbnailing the image here (off the Tk thread)."""
+        raw, thumb = None, None
+        try:
+            raw, _mime = data_url_to_bytes_and_mime(url)
+            thumb = bytes_to_preview_pil(raw, max_width=SHOT_PREVIEW_WIDTH)
+        except Exception:  # noqa: BLE001 - e.g. provider returned a plain URL
+            pass
+        self._post_event("gen_done", shot_id, url, raw, thumb)
 
     def _generate_shots_from_context(self) -> None:
         self._on_log("🎭 Generating shots from context")
@@ -1026,8 +1323,9 @@ class MaestroApp(ctk.CTk):
             return
 
         self._set_status("🎬 Calling Director to generate shots from context...")
-        self.btn_gen_all.configure(state="disabled", text="⏳ Generating...")
-        self.btn_analyze.configure(state="disabled")
+        self._action_running = True
+        self._configure_if_changed(self.btn_gen_all, state="disabled", text="⏳ Generating...")
+        self._configure_if_changed(self.btn_analyze, state="disabled")
 
         self.show_toast("🎬 Generating shots...", duration_ms=2000)
 
@@ -1040,11 +1338,11 @@ class MaestroApp(ctk.CTk):
                     cancel=self.app_state.cancel_event,
                     shot_count=self.app_state.shot_count,
                 )
-                self.events.put(("shots_done", shots))
+                self._post_event("shots_done", shots)
             except Exception as e:  # noqa: BLE001
-                self.events.put(("error", f"Generate shots failed: {e}"))
+                self._post_event("error", f"Generate shots failed: {e}")
 
-        threading.Thread(target=worker, daemon=True).start()
+        self._executor.submit(worker)
 
         # Let the main event loop handle the shots_done event
 
@@ -1053,8 +1351,8 @@ class MaestroApp(ctk.CTk):
         # Disable actions if API key missing
         if not (self.app_state.cfg and self.app_state.cfg.openrouter_api_key):
             try:
-                self.btn_analyze.configure(state="disabled")
-                self.btn_gen_all.configure(state="disabled")
+                self._configure_if_changed(self.btn_analyze, state="disabled")
+                self._configure_if_changed(self.btn_gen_all, state="disabled")
             except Exception:
                 pass
             self._on_log("OPENROUTER_API_KEY missing; analysis and image generation may fail.")
@@ -1063,21 +1361,29 @@ class MaestroApp(ctk.CTk):
         def worker() -> None:
             try:
                 ok, msg = connectivity_probe()
-                self.events.put(("conn_check", ok, msg))
+                self._post_event("conn_check", ok, msg)
             except Exception as e:  # noqa: BLE001
-                self.events.put(("conn_check", False, str(e)))
+                self._post_event("conn_check", False, str(e))
 
-        threading.Thread(target=worker, daemon=True).start()
+        def warm_upscaler() -> None:
+            # Load Real-ESRGAN weights now so the first auto-upscale doesn't pay for it
+            try:
+                _get_upscaler().warm_up()
+                self._on_log("✅ Upscaler model loaded")
+            except Exception as e:  # noqa: BLE001
+                self._on_log(f"⚠️  Upscaler warm-up failed: {e}")
+
+        self._executor.submit(worker)
+        self._upscale_executor.submit(warm_upscaler)
 
     # ---------- Save & Upscale ----------
     def _save_original(self, shot_id: int) -> None:
         self._on_log(f"💾 Starting save operation for shot {shot_id}")
-        from tkinter.filedialog import asksaveasfilename
-        up = self.app_state.upscaled.get(shot_id)
-        if not up:
+        src_path = self.app_state.saved_paths.get(shot_id)
+        if not src_path or not os.path.exists(src_path):
             self._on_log(f"❌ No upscaled data found for shot {shot_id}")
             return
-        data_size = len(up)
+        data_size = os.path.getsize(src_path)
         ext = ".png"
 
         self._on_log(f"📁 Opening save dialog for shot {shot_id}...")
@@ -1086,13 +1392,17 @@ class MaestroApp(ctk.CTk):
             self._on_log(f"❌ Save operation cancelled for shot {shot_id}")
             return
 
-        try:
-            self._on_log(f"💾 Writing {data_size:,} bytes to {os.path.basename(path)}...")
-            with open(path, "wb") as f:
-                f.write(up)
-            self._on_log(f"✅ Saved upscaled for shot {shot_id}: {os.path.basename(path)} ({data_size:,} bytes)")
-        except Exception as e:  # noqa: BLE001
-            self._on_log(f"❌ Save failed for shot {shot_id}: {e}")
+        self._on_log(f"💾 Writing {data_size:,} bytes to {os.path.basename(path)}...")
+
+        def worker() -> None:
+            # Slow targets (network drives, AV scanning) must not stall the Tk loop
+            try:
+                shutil.copyfile(src_path, path)
+                self._post_event("save_done", shot_id, path, data_size, None)
+            except Exception as e:  # noqa: BLE001
+                self._post_event("save_done", shot_id, path, data_size, str(e))
+
+        self._io_executor.submit(worker)
 
     def _upscale(self, shot_id: int) -> None:
         # Deprecated: kept as no-op for safety if any bindings remain
@@ -1129,7 +1439,6 @@ class MaestroApp(ctk.CTk):
 
         def save_settings() -> None:
             self._on_log("💾 Applying runtime settings...")
-            from dataclasses import replace
             new_cfg = replace(cfg,
                               openrouter_api_key=ent_api.get().strip() or None,
                               context_model=ent_ctx.get().strip() or cfg.context_model,
@@ -1174,26 +1483,35 @@ class MaestroApp(ctk.CTk):
                 log_map["OPENROUTER_API_KEY"] = "***masked***"
             self._on_log(f"📝 Writing environment variables: {log_map}")
 
-            try:
-                self._write_env(env_map)
-                self._on_log("✅ .env file updated successfully")
-            except Exception as e:  # noqa: BLE001
-                self._on_log(f"❌ Failed to write .env: {e}")
+            def worker() -> None:
+                try:
+                    if self._write_env(env_map):
+                        self._on_log("✅ .env file updated successfully")
+                    else:
+                        self._on_log("ℹ️ .env already up to date")
+                except Exception as e:  # noqa: BLE001
+                    self._on_log(f"❌ Failed to write .env: {e}")
+
+            self._io_executor.submit(worker)
             save_settings()
 
         def test_connectivity() -> None:
+            # Probes take seconds; read the entries here and run them on the executor
             api_key = ent_api.get().strip()
-            ok_base, msg_base = connectivity_probe()
-            msg = f"Base: {'OK' if ok_base else 'FAIL'} ({msg_base})"
-            if api_key:
-                ok_models, msg_models = openrouter_models_probe(api_key)
-                ok_chat, msg_chat = openrouter_chat_probe(api_key, ent_ctx.get().strip() or cfg.context_model)
-                msg += f" | Models: {'OK' if ok_models else 'FAIL'} ({msg_models}) | Chat: {'OK' if ok_chat else 'FAIL'} ({msg_chat})"
-            self._on_log(f"Connectivity: {msg}")
-            try:
-                lbl_test.configure(text=msg)
-            except Exception:
-                pass
+            model = ent_ctx.get().strip() or cfg.context_model
+            lbl_test.configure(text="⏳ Testing...")
+            btn_test.configure(state="disabled")
+
+            def worker() -> None:
+                ok_base, msg_base = connectivity_probe()
+                msg = f"Base: {'OK' if ok_base else 'FAIL'} ({msg_base})"
+                if api_key:
+                    ok_models, msg_models = openrouter_models_probe(api_key)
+                    ok_chat, msg_chat = openrouter_chat_probe(api_key, model)
+                    msg += f" | Models: {'OK' if ok_models else 'FAIL'} ({msg_models}) | Chat: {'OK' if ok_chat else 'FAIL'} ({msg_chat})"
+                self._post_event("conn_test", lbl_test, btn_test, msg)
+
+            self._executor.submit(worker)
 
         btn_save = ctk.CTkButton(win, text="Save", command=save_settings)
         btn_save_env = ctk.CTkButton(win, text="Save + Write .env", command=write_env_and_save)
@@ -1214,41 +1532,96 @@ class MaestroApp(ctk.CTk):
         btn_save_env.pack(padx=12, pady=(0, 12))
 
     # ---------- .env ----------
-    def _write_env(self, kv: dict[str, str]) -> None:
-        root_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
-        env_path = os.path.join(root_dir, ".env")
-        # Load existing
+    def _write_env(self, kv: dict[str, str]) -> bool:
+        """Merge `kv` into the project .env; returns False when nothing changed.
+
+        The file is replaced atomically, so a crash mid-write never leaves a truncated .env.
+        """
+        with self._env_lock:
+            existing = self._read_env()
+            merged = {**existing, **{k: v for k, v in kv.items() if v is not None}}
+            if merged == existing and os.path.exists(ENV_PATH):
+                return False
+            data = "".join(f"{k}={v}\n" for k, v in merged.items())
+            tmp_path = f"{ENV_PATH}.tmp"
+            with open(tmp_path, "w", encoding="utf-8", newline="\n") as f:
+                f.write(data)
+            if os.path.exists(ENV_PATH):
+                shutil.copymode(ENV_PATH, tmp_path)  # keep e.g. 0600 on a file holding the API key
+            os.replace(tmp_path, ENV_PATH)
+            self._env_cache = (os.stat(ENV_PATH).st_mtime_ns, merged)
+            return True
+
+    def _read_env(self) -> dict[str, str]:
+        # Parsed once and reused until the file changes on disk
+        try:
+            mtime = os.stat(ENV_PATH).st_mtime_ns
+        except OSError:
+            return {}
+        if self._env_cache is not None and self._env_cache[0] == mtime:
+            return self._env_cache[1]
         existing: dict[str, str] = {}
-        if os.path.exists(env_path):
-            try:
-                with open(env_path, "r", encoding="utf-8") as f:
-                    for line in f:
-                        line = line.strip()
-                        if not line or line.startswith("#") or "=" not in line:
-                            continue
-                        k, v = line.split("=", 1)
-                        existing[k.strip()] = v.strip()
-            except Exception:
-                pass
-        # Update and write
-        existing.update({k: v for k, v in kv.items() if v is not None})
-        lines = [f"{k}={v}\n" for k, v in existing.items()]
-        with open(env_path, "w", encoding="utf-8") as f:
-            f.writelines(lines)
+        try:
+            with open(ENV_PATH, "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line or line.startswith("#") or "=" not in line:
+                        continue
+                    k, v = line.split("=", 1)
+                    existing[k.strip()] = v.strip()
+        except Exception:
+            pass
+        self._env_cache = (mtime, existing)
+        return existing
+
+    # ---------- Shutdown ----------
+    def _on_close(self) -> None:
+        self.app_state.cancel_event.set()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._io_executor.shutdown(wait=False, cancel_futures=True)
+        self._upscale_executor.shutdown(wait=False, cancel_futures=True)
+        shutdown_image_pool()
+        self.destroy()
 
     # ---------- Toasts ----------
     def show_toast(self, message: str, *, duration_ms: int = 2500) -> None:
+        # Bursts (e.g. a whole event drain) collapse into one update showing the newest message
+        self._toast_pending = (message, duration_ms)
+        if self._toast_after_id is None:
+            wait_ms = int((TOAST_MIN_INTERVAL_SEC - (time.monotonic() - self._toast_last)) * 1000)
+            self._toast_after_id = self.after(max(0, wait_ms), self._flush_toast)
+
+    def _flush_toast(self) -> None:
+        self._toast_after_id = None
+        pending, self._toast_pending = self._toast_pending, None
+        if pending is None:
+            return
+        message, duration_ms = pending
+        self._toast_last = time.monotonic()
         try:
-            toast = ctk.CTkToplevel(self)
-            toast.overrideredirect(True)
-            toast.attributes("-topmost", True)
-            lbl = ctk.CTkLabel(toast, text=message)
-            lbl.pack(padx=12, pady=8)
+            # One borderless Toplevel is reused for every toast; it is only hidden in between
+            if self._toast is None or not self._toast.winfo_exists():
+                self._toast = ctk.CTkToplevel(self)
+                self._toast.overrideredirect(True)
+                self._toast.attributes("-topmost", True)
+                self._toast_label = ctk.CTkLabel(self._toast, text="")
+                self._toast_label.pack(padx=12, pady=8)
+            self._toast_label.configure(text=message)
             self.update_idletasks()
-            x = self.winfo_x() + self.winfo_width() - toast.winfo_reqwidth() - 24
-            y = self.winfo_y() + self.winfo_height() - toast.winfo_reqheight() - 48
-            toast.geometry(f"+{x}+{y}")
-            toast.after(duration_ms, toast.destroy)
+            x = self.winfo_x() + self.winfo_width() - self._toast.winfo_reqwidth() - 24
+            y = self.winfo_y() + self.winfo_height() - self._toast.winfo_reqheight() - 48
+            self._toast.geometry(f"+{x}+{y}")
+            self._toast.deiconify()
+            if self._toast_hide_id is not None:
+                self.after_cancel(self._toast_hide_id)
+            self._toast_hide_id = self.after(duration_ms, self._hide_toast)
+        except Exception:
+            pass
+
+    def _hide_toast(self) -> None:
+        self._toast_hide_id = None
+        try:
+            self._toast.withdraw()
         except Exception:
             pass
 
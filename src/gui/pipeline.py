@@ -1,20 +1,27 @@
 from __future__ import annotations
 
-from threading import Event
-from typing import Callable, List, Optional, Tuple
+import hashlib
+from collections import OrderedDict
+from concurrent.futures import Future
+from threading import Event, Lock
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Tuple, TypeVar
 
 from src.config import V2Config, create_openrouter_client, load_config
 from src.services.context import fetch_context_paragraph
 from src.services.director import fetch_director_shots
-from src.services.images import generate_image
+from src.services.images import generate_image, generate_images_concurrently, get_image_pool
 from src.services.storage import compress_image_bytes_to_jpeg_data_url
-from src.services.video import (
-    estimate_context_frame_count,
-    sample_context_frames_as_data_urls,
-    sample_middle_frame_as_data_url,
-)
 from src.types import Shot
 
+if TYPE_CHECKING:
+    # Decoder imports (PyAV/OpenCV) are deferred to the first analysis
+    from src.services.video import VideoSource
+
+T = TypeVar("T")
+
+# Context paragraphs kept per (sampled frames, context model)
+_CONTEXT_CACHE_MAX = 16
+
 
 class Pipeline:
     """Thin, GUI-oriented wrapper over existing service functions.
@@ -33,6 +40,12 @@ class Pipeline:
         self.on_log(f"📋 Loaded configuration: context_model={self.cfg.context_model}, director_model={self.cfg.director_model}")
 
         self.client = create_openrouter_client(self.cfg.openrouter_api_key) if self.cfg.openrouter_api_key else None
+        # Context results memoized per frames + model; concurrent identical requests share one call
+        self._context_cache: "OrderedDict[tuple, str]" = OrderedDict()
+        self._context_lock = Lock()
+        self._context_flight = _SingleFlight()
+        # Identical image requests (same style, text and model) in flight at once are billed once
+        self._image_flight = _SingleFlight()
         if self.client:
             self.on_log("🔗 OpenRouter client initialized successfully")
         else:
@@ -64,9 +77,37 @@ class Pipeline:
         self.on_log("✅ Style preview built successfully")
         return result
 
+    def _fetch_context(self, frame_urls: List[str], *, use_cache: bool = True) -> str:
+        """`fetch_context_paragraph`, reusing the result for frames already described by this model.
+
+        `use_cache=False` always asks the model again (a fresh description) and stores the new result.
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        for url in frame_urls:
+            digest.update(url.encode())
+        key = (digest.hexdigest(), self.cfg.context_model)
+        with self._context_lock:
+            if use_cache and key in self._context_cache:
+                self._context_cache.move_to_end(key)
+                self.on_log("♻️ Reusing context from an earlier analysis of these frames (analyze again for a fresh one)")
+                return self._context_cache[key]
+        context_text, shared = self._context_flight.run(
+            key, lambda: fetch_context_paragraph(self.client, self.cfg, frame_urls, on_log=self.on_log)
+        )
+        if shared:
+            self.on_log("♻️ Joined an identical context request that was already running")
+        elif context_text:
+            with self._context_lock:
+                self._context_cache[key] = context_text
+                while len(self._context_cache) > _CONTEXT_CACHE_MAX:
+                    self._context_cache.popitem(last=False)
+        return context_text
+
     # ---------- High level flows ----------
-    def analyze(self, video_bytes: bytes, cancel: Optional[Event] = None) -> Tuple[str, List[Shot]]:
+    def analyze(self, video: VideoSource, cancel: Optional[Event] = None) -> Tuple[str, List[Shot]]:
         """Legacy: Run full pipeline and return (context_text, shots)."""
+        from src.services.video import estimate_context_frame_count
+
         self.on_log("🎬 Starting video analysis pipeline...")
         cancel = cancel or Event()
 
@@ -77,7 +118,7 @@ class Pipeline:
         # Step 1: Frame count estimation
         self.on_log("📊 Estimating optimal frame count for context analysis...")
         try:
-            n_frames = estimate_context_frame_count(video_bytes, seconds_per_frame=2.0, min_frames=1)
+            n_frames = estimate_context_frame_count(video, seconds_per_frame=2.0, min_frames=1)
             self.on_log(f"📈 Estimated {n_frames} frames needed (2s per frame, min 1)")
         except Exception as e:
             self.on_log(f"❌ Frame count estimation failed: {e}")
@@ -87,11 +128,11 @@ class Pipeline:
             self.on_log("❌ Analysis cancelled after frame estimation")
             return "", []
 
-        # Step 2: Sample context frames
-        self.on_log(f"🎥 Sampling {n_frames} evenly spaced frames for context...")
+        # Steps 2-3: Sample context frames and the middle frame in one decoder pass over the video
+        self.on_log(f"🎥 Sampling {n_frames} evenly spaced context frames and the middle frame in one pass...")
         try:
-            frame_urls = sample_context_frames_as_data_urls(video_bytes, n=n_frames)
-            self.on_log(f"✅ Sampled {len(frame_urls)} context frames successfully")
+            frame_urls, middle_url = _sample_frames(video, n_frames)
+            self.on_log(f"✅ Sampled {len(frame_urls)} context frames and the middle frame successfully")
         except Exception as e:
             self.on_log(f"❌ Frame sampling failed: {e}")
             return "", []
@@ -100,23 +141,10 @@ class Pipeline:
             self.on_log("❌ Analysis cancelled after frame sampling")
             return "", []
 
-        # Step 3: Sample middle frame
-        self.on_log("🎯 Sampling middle frame for director analysis...")
-        try:
-            middle_url = sample_middle_frame_as_data_url(video_bytes)
-            self.on_log("✅ Middle frame sampled successfully")
-        except Exception as e:
-            self.on_log(f"❌ Middle frame sampling failed: {e}")
-            return "", []
-
-        if cancel.is_set():
-            self.on_log("❌ Analysis cancelled after middle frame sampling")
-            return "", []
-
         # Step 4: Fetch context
         self.on_log(f"🧠 Context analysis: calling {self.cfg.context_model}...")
         try:
-            context_text = fetch_context_paragraph(self.client, self.cfg, frame_urls, on_log=self.on_log)
+            context_text = self._fetch_context(frame_urls)
             context_length = len(context_text) if context_text else 0
             self.on_log(f"✅ Context analysis complete ({context_length} characters)")
         except Exception as e:
@@ -140,23 +168,40 @@ class Pipeline:
         return context_text, shots
 
     # --- New split flow ---
-    def analyze_context(self, video_bytes: bytes, cancel: Optional[Event] = None) -> Tuple[str, str]:
-        """Return (context_text, middle_frame_data_url) without generating shots."""
+    def analyze_context(
+        self,
+        video: VideoSource,
+        cancel: Optional[Event] = None,
+        *,
+        middle_frame_data_url: Optional[str] = None,
+        use_cache: bool = True,
+    ) -> Tuple[str, str]:
+        """Return (context_text, middle_frame_data_url) without generating shots.
+
+        Pass `middle_frame_data_url` when the caller already sampled it (e.g. for a preview)
+        to skip decoding the video a second time. Pass `use_cache=False` to get a new context
+        paragraph even if these frames were described before.
+        """
+        from src.services.video import estimate_context_frame_count
+
         self.on_log("🎬 Starting context-only analysis...")
         cancel = cancel or Event()
 
         # Frame steps
         try:
-            n_frames = estimate_context_frame_count(video_bytes, seconds_per_frame=2.0, min_frames=1)
-            frame_urls = sample_context_frames_as_data_urls(video_bytes, n=n_frames)
-            middle_url = sample_middle_frame_as_data_url(video_bytes)
+            n_frames = estimate_context_frame_count(video, seconds_per_frame=2.0, min_frames=1)
+            if middle_frame_data_url:
+                self.on_log(f"🎥 Sampling {n_frames} context frames (reusing the preview as the middle frame)...")
+            else:
+                self.on_log(f"🎥 Sampling {n_frames} context frames and the middle frame in one pass...")
+            frame_urls, middle_url = _sample_frames(video, n_frames, middle_frame_data_url)
         except Exception as e:
             self.on_log(f"❌ Context pre-processing failed: {e}")
             return "", ""
 
         # Fetch context
         try:
-            context_text = fetch_context_paragraph(self.client, self.cfg, frame_urls, on_log=self.on_log)
+            context_text = self._fetch_context(frame_urls, use_cache=use_cache)
         except Exception as e:
             self.on_log(f"❌ Context analysis failed: {e}")
             return "", middle_url
@@ -176,14 +221,113 @@ class Pipeline:
             raise
 
     def generate_one(self, style_data_url: str, shot_text: str) -> str:
+        return self.submit_one(style_data_url, shot_text).result()
+
+    def submit_one(self, style_data_url: str, shot_text: str) -> "Future[str]":
+        """Start one image generation and return its Future without waiting on it.
+
+        The request runs on the shared image pool, so single shots count against the same
+        concurrency limit as batches; callers attach `add_done_callback` instead of blocking a thread.
+        """
         shot_preview = shot_text[:50] + "..." if len(shot_text) > 50 else shot_text
         self.on_log(f"🎨 Starting image generation for shot: '{shot_preview}'")
-        try:
-            result = generate_image(self.client, self.cfg, style_data_url, shot_text, on_log=self.on_log)
+        pool = get_image_pool(self.cfg.max_concurrent_requests)
+        client, cfg = self.client, self.cfg
+        key = (
+            hashlib.blake2b(style_data_url.encode(), digest_size=16).hexdigest(),
+            shot_text,
+            cfg.image_model,
+        )
+        future, shared = self._image_flight.submit(
+            key, lambda: pool.submit(generate_image, client, cfg, style_data_url, shot_text, on_log=self.on_log)
+        )
+        if shared:
+            self.on_log("♻️ Identical image request was already running; reusing its result")
+        future.add_done_callback(self._log_image_result)
+        return future
+
+    def _log_image_result(self, future: "Future[str]") -> None:
+        if future.cancelled():
+            return
+        if future.exception() is None:
             self.on_log("✅ Image generation completed successfully")
-            return result
-        except Exception as e:
-            self.on_log(f"❌ Image generation failed: {e}")
+        else:
+            self.on_log(f"❌ Image generation failed: {future.exception()}")
+
+    def generate_all(
+        self,
+        style_data_url: str,
+        shot_id_to_text: Dict[int, str],
+        on_progress: Optional[Callable[[int, Optional[str], Optional[Exception]], None]] = None,
+    ) -> Dict[int, str]:
+        """Generate images for several shots concurrently; returns {shot_id: data_url} for successes."""
+        self.on_log(f"🎨 Starting image generation for {len(shot_id_to_text)} shots (up to {self.cfg.max_concurrent_requests} at once)...")
+        results = generate_images_concurrently(
+            self.client,
+            self.cfg,
+            style_data_url,
+            shot_id_to_text,
+            on_progress=on_progress,
+            on_log=self.on_log,
+        )
+        self.on_log(f"✅ Image generation finished ({len(results)}/{len(shot_id_to_text)} succeeded)")
+        return {sid: r.image_data_url for sid, r in results.items()}
+
+
+class _SingleFlight:
+    """Collapse concurrent calls with the same key into one execution.
+
+    The first caller runs `fn`; callers arriving while it runs wait for and share its
+    result (or exception). Nothing is kept once the call completes.
+    """
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self._inflight: Dict[tuple, Future] = {}
+
+    def run(self, key: tuple, fn: Callable[[], T]) -> Tuple[T, bool]:
+        """Return (result, shared) where `shared` is True if another caller's run was joined."""
+        with self._lock:
+            pending = self._inflight.get(key)
+            owner = pending is None
+            if owner:
+                pending = self._inflight[key] = Future()
+        if not owner:
+            return pending.result(), True
+        try:
+            result = fn()
+        except BaseException as e:
+            with self._lock:
+                self._inflight.pop(key, None)
+            pending.set_exception(e)
             raise
+        with self._lock:
+            self._inflight.pop(key, None)
+        pending.set_result(result)
+        return result, False
+
+    def submit(self, key: tuple, start: Callable[[], Future]) -> Tuple[Future, bool]:
+        """Non-blocking variant: return (future, shared), calling `start()` only if no call for `key` is running."""
+        with self._lock:
+            pending = self._inflight.get(key)
+            if pending is not None:
+                return pending, True
+            future = self._inflight[key] = start()
+
+        def forget(done: Future) -> None:
+            with self._lock:
+                if self._inflight.get(key) is done:
+                    del self._inflight[key]
+
+        future.add_done_callback(forget)
+        return future, False
+
 
+def _sample_frames(video: VideoSource, n_frames: int, middle_frame_data_url: Optional[str] = None) -> Tuple[List[str], str]:
+    """Return (context frame URLs, middle frame URL), reusing `middle_frame_data_url` when given."""
+    from src.services.video import sample_context_and_middle_frames_as_data_urls, sample_context_frames_as_data_urls
 
+    if middle_frame_data_url:
+        return sample_context_frames_as_data_urls(video, n=n_frames), middle_frame_data_url
+    # One walk over the video yields both; no second decoder pass for the middle frame
+    return sample_context_and_middle_frames_as_data_urls(video, n=n_frames)
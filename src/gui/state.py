@@ -1,17 +1,22 @@
 from __future__ import annotations
 
+from collections import deque
 from dataclasses import dataclass, field
 from threading import Event
-from typing import Dict, List, Optional
+from typing import Deque, Dict, List, Optional
 
 from src.config import V2Config
 from src.types import Shot
 
+# Activity log entries kept in memory and in the log panel; older lines are dropped
+LOG_HISTORY_MAX = 500
 
-@dataclass
+
+@dataclass(slots=True)
 class AppState:
     video_path: Optional[str] = None
-    video_bytes: Optional[bytes] = None
+    # Middle frame sampled for the sidebar preview; reused by analysis
+    video_preview_data_url: Optional[str] = None
 
     style_path: Optional[str] = None
     style_data_url: str = ""
@@ -23,13 +28,12 @@ class AppState:
     # User-configurable number of shots to generate
     shot_count: int = 5
 
-    results: Dict[int, str] = field(default_factory=dict)
     errors: Dict[int, str] = field(default_factory=dict)
-    upscaled: Dict[int, bytes] = field(default_factory=dict)
+    # Autosaved upscaled PNG per shot; images are kept on disk, not in memory
     saved_paths: Dict[int, str] = field(default_factory=dict)
     in_progress: Dict[int, bool] = field(default_factory=dict)
 
-    logs: List[str] = field(default_factory=list)
+    logs: Deque[str] = field(default_factory=lambda: deque(maxlen=LOG_HISTORY_MAX))
 
     cfg: Optional[V2Config] = None
     cancel_event: Event = field(default_factory=Event)
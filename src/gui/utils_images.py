@@ -1,42 +1,62 @@
 from __future__ import annotations
 
-import base64
+import hashlib
 import io
-from typing import Optional, Tuple
+from collections import OrderedDict
+from typing import Callable, Optional, Tuple
 
 from PIL import Image
 import customtkinter as ctk
 import requests
 
+from src.services.storage import data_url_to_bytes_and_mime, decode_jpeg_turbo
+
+# CTkImages already built, keyed by (content digest, max_width); only touched from the Tk thread
+_CTK_CACHE_MAX = 64
+_ctk_cache: "OrderedDict[tuple, ctk.CTkImage]" = OrderedDict()
+
 
 def _normalize_data_url(value: str) -> str:
     s = (value or "").strip()
-    if (s.startswith("'") and s.endswith("'")) or (s.startswith('"') and s.endswith('"')):
+    if s.startswith("data:"):
+        # Common case: already a bare data URL, skip scanning the (large) payload
+        return s
+    if s[:1] in ("'", '"') and s[-1:] == s[:1]:
         s = s[1:-1]
-    if "data:image/" in s and not s.startswith("data:"):
-        i = s.find("data:image/")
+    i = s.find("data:image/")
+    if i > 0:
         s = s[i:]
     return s
 
 
 def data_url_to_bytes(data_url: str) -> bytes:
-    if not isinstance(data_url, str) or "," not in data_url:
+    if not isinstance(data_url, str):
         raise ValueError("Invalid data URL")
-    _header, b64 = data_url.split(",", 1)
-    return base64.b64decode(b64)
+    return data_url_to_bytes_and_mime(data_url)[0]
+
+
+def bytes_to_pil_image(raw: bytes, max_width: Optional[int] = None) -> Image.Image:
+    # JPEGs (video frames, generated shots) go through libjpeg-turbo when it is installed
+    img = decode_jpeg_turbo(raw, min_width=2 * max_width if max_width else None)
+    if img is not None:
+        return img
+    img = Image.open(io.BytesIO(raw))
+    if max_width and img.format == "JPEG":
+        # Let libjpeg scale during the DCT (1/2..1/8); keep 2x headroom for HiDPI before the final resize
+        img.draft("RGB", _fit_size(img.width, img.height, 2 * max_width))
+    if img.mode not in ("RGB", "RGBA"):
+        img = img.convert("RGBA")
+    return img
 
 
-def data_url_to_pil_image(data_url: str) -> Image.Image:
+def data_url_to_pil_image(data_url: str, max_width: Optional[int] = None) -> Image.Image:
     s = _normalize_data_url(data_url)
     if s.startswith("http://") or s.startswith("https://"):
         r = requests.get(s, timeout=30)
         raw = r.content
     else:
         raw = data_url_to_bytes(s)
-    img = Image.open(io.BytesIO(raw))
-    if img.mode not in ("RGB", "RGBA"):
-        img = img.convert("RGBA")
-    return img
+    return bytes_to_pil_image(raw, max_width)
 
 
 def _fit_size(width: int, height: int, max_width: Optional[int]) -> Tuple[int, int]:
@@ -47,7 +67,51 @@ def _fit_size(width: int, height: int, max_width: Optional[int]) -> Tuple[int, i
 
 
 def data_url_to_ctkimage(data_url: str, max_width: Optional[int] = None) -> ctk.CTkImage:
-    img = data_url_to_pil_image(data_url)
+    """Decode to a CTkImage, reusing the one built earlier for the same image and width."""
+    key = (hashlib.blake2b(data_url.encode(), digest_size=16).digest(), max_width)
+    return _cached_ctkimage(key, lambda: pil_to_ctkimage(data_url_to_pil_image(data_url, max_width), max_width))
+
+
+def bytes_to_ctkimage(raw: bytes, max_width: Optional[int] = None) -> ctk.CTkImage:
+    """Like `data_url_to_ctkimage` for already-decoded image bytes (no base64 pass)."""
+    key = (hashlib.blake2b(raw, digest_size=16).digest(), max_width)
+    return _cached_ctkimage(key, lambda: pil_to_ctkimage(bytes_to_pil_image(raw, max_width), max_width))
+
+
+def _cached_ctkimage(key: tuple, build: Callable[[], ctk.CTkImage]) -> ctk.CTkImage:
+    cimg = _ctk_cache.get(key)
+    if cimg is not None:
+        _ctk_cache.move_to_end(key)
+        return cimg
+    cimg = build()
+    _ctk_cache[key] = cimg
+    while len(_ctk_cache) > _CTK_CACHE_MAX:
+        _ctk_cache.popitem(last=False)
+    return cimg
+
+
+def ctkimage_cache_clear() -> None:
+    _ctk_cache.clear()
+
+
+def data_url_to_preview_pil(data_url: str, max_width: Optional[int] = None) -> Image.Image:
+    """Decode and downscale for display without touching Tk, so it can run on a worker thread."""
+    return _downscale_for_preview(data_url_to_pil_image(data_url, max_width), max_width)
+
+
+def bytes_to_preview_pil(raw: bytes, max_width: Optional[int] = None) -> Image.Image:
+    """Like `data_url_to_preview_pil` for already-decoded image bytes."""
+    return _downscale_for_preview(bytes_to_pil_image(raw, max_width), max_width)
+
+
+def _downscale_for_preview(img: Image.Image, max_width: Optional[int]) -> Image.Image:
+    w, h = _fit_size(img.width, img.height, max_width)
+    if (w, h) != (img.width, img.height):
+        img = img.resize((w, h), Image.LANCZOS)
+    return img
+
+
+def pil_to_ctkimage(img: Image.Image, max_width: Optional[int] = None) -> ctk.CTkImage:
     w, h = _fit_size(img.width, img.height, max_width)
     if (w, h) != (img.width, img.height):
         img = img.resize((w, h), Image.LANCZOS)
@@ -1,15 +1,52 @@
+import random
 import time
-from typing import Callable, Optional, Tuple
+from typing import Callable, Dict, Optional, Tuple
 
-import requests
+# Probes share the API calls' keep-alive session, so a passing probe leaves a warm TLS connection
+from src.services.openrouter_http import get_session
+
+
+# Successful probe results are reused for a short window; failures are always re-probed
+_PROBE_TTL_SEC = 30.0
+_probe_cache: Dict[tuple, Tuple[float, Tuple[bool, str]]] = {}
+
+
+# Upper bound on a server-requested Retry-After wait (s)
+_RETRY_AFTER_MAX_SEC = 60.0
+
+
+def _cached_probe(key: tuple, probe: Callable[[], Tuple[bool, str]]) -> Tuple[bool, str]:
+    hit = _probe_cache.get(key)
+    if hit and time.monotonic() - hit[0] < _PROBE_TTL_SEC:
+        return hit[1]
+    result = probe()
+    if result[0]:
+        _probe_cache[key] = (time.monotonic(), result)
+    return result
 
 
 def connectivity_probe(url: str = "https://openrouter.ai/api/v1", timeout_sec: int = 5) -> tuple[bool, str]:
+    def probe() -> Tuple[bool, str]:
+        try:
+            resp = get_session().get(url, timeout=timeout_sec)
+            return (resp.ok, f"HTTP {resp.status_code}")
+        except Exception as e:  # noqa: BLE001
+            return (False, str(e))
+
+    return _cached_probe(("connectivity", url, timeout_sec), probe)
+
+
+def _retry_after_sec(exc: Exception) -> Optional[float]:
+    """Seconds from a Retry-After header on a 429/503 response attached to `exc` (requests/httpx), if any."""
+    resp = getattr(exc, "response", None)
+    if resp is None or getattr(resp, "status_code", None) not in (429, 503):
+        return None
     try:
-        resp = requests.get(url, timeout=timeout_sec)
-        return (resp.ok, f"HTTP {resp.status_code}")
-    except Exception as e:  # noqa: BLE001
-        return (False, str(e))
+        value = resp.headers.get("Retry-After")
+        # Only the delta-seconds form; HTTP dates fall back to the jittered delay
+        return min(max(0.0, float(value)), _RETRY_AFTER_MAX_SEC) if value else None
+    except Exception:  # noqa: BLE001
+        return None
 
 
 def with_backoff(
@@ -27,7 +64,11 @@ def with_backoff(
             last_exc = e
             if attempt == retries:
                 break
-            delay = base_delay * (2 ** attempt)
+            # Full jitter: concurrent callers hitting the same rate limit spread out instead of retrying in lockstep
+            delay = random.uniform(0, base_delay * (2 ** attempt))
+            retry_after = _retry_after_sec(e)
+            if retry_after is not None:
+                delay = retry_after
             if on_log:
                 on_log(f"Retrying after error: {e} (sleep {delay:.1f}s)…")
             time.sleep(delay)
@@ -37,41 +78,44 @@ def with_backoff(
 
 
 def openrouter_models_probe(api_key: str, timeout_sec: int = 8) -> Tuple[bool, str]:
-    try:
-        resp = requests.get(
-            "https://openrouter.ai/api/v1/models",
-            headers={"Authorization": f"Bearer {api_key}"},
-            timeout=timeout_sec,
-        )
-        if resp.ok:
-            return True, f"HTTP {resp.status_code}, {len(resp.json().get('data', []))} models"
-        return False, f"HTTP {resp.status_code}: {resp.text[:200]}"
-    except Exception as e:  # noqa: BLE001
-        return False, str(e)
-
+    def probe() -> Tuple[bool, str]:
+        try:
+            resp = get_session().get(
+                "https://openrouter.ai/api/v1/models",
+                headers={"Authorization": f"Bearer {api_key}"},
+                timeout=timeout_sec,
+            )
+            if resp.ok:
+                return True, f"HTTP {resp.status_code}, {len(resp.json().get('data', []))} models"
+            return False, f"HTTP {resp.status_code}: {resp.text[:200]}"
+        except Exception as e:  # noqa: BLE001
+            return False, str(e)
 
-def openrouter_chat_probe(api_key: str, model: str, timeout_sec: int = 12) -> Tuple[bool, str]:
-    try:
-        payload = {
-            "model": model,
-            "messages": [{"role": "user", "content": [{"type": "text", "text": "ping"}]}],
-        }
-        resp = requests.post(
-            "https://openrouter.ai/api/v1/chat/completions",
-            headers={
-                "Authorization": f"Bearer {api_key}",
-                "Content-Type": "application/json",
-                "HTTP-Referer": "http://localhost",
-                "X-Title": "Project Maestro v2",
-            },
-            json=payload,
-            timeout=timeout_sec,
-        )
-        if resp.ok:
-            return True, f"HTTP {resp.status_code}"
-        return False, f"HTTP {resp.status_code}: {resp.text[:200]}"
-    except Exception as e:  # noqa: BLE001
-        return False, str(e)
+    return _cached_probe(("models", api_key, timeout_sec), probe)
 
 
+def openrouter_chat_probe(api_key: str, model: str, timeout_sec: int = 12) -> Tuple[bool, str]:
+    def probe() -> Tuple[bool, str]:
+        try:
+            payload = {
+                "model": model,
+                "messages": [{"role": "user", "content": [{"type": "text", "text": "ping"}]}],
+            }
+            resp = get_session().post(
+                "https://openrouter.ai/api/v1/chat/completions",
+                headers={
+                    "Authorization": f"Bearer {api_key}",
+                    "Content-Type": "application/json",
+                    "HTTP-Referer": "http://localhost",
+                    "X-Title": "Project Maestro v2",
+                },
+                json=payload,
+                timeout=timeout_sec,
+            )
+            if resp.ok:
+                return True, f"HTTP {resp.status_code}"
+            return False, f"HTTP {resp.status_code}: {resp.text[:200]}"
+        except Exception as e:  # noqa: BLE001
+            return False, str(e)
 
+    return _cached_probe(("chat", api_key, model, timeout_sec), probe)
@@ -14,6 +14,7 @@ from src.services import with_backoff
 from src.types import GenerationResult
 from src.services.openrouter_http import chat_completions
 from src.services.storage import bytes_to_data_url
+from src.services.workers import DaemonThreadPoolExecutor
 
 
 IMAGE_SYSTEM_PROMPT = (
@@ -251,16 +252,16 @@ def generate_images_concurrently(
     style_image_data_url: str,
     shot_id_to_text: Dict[int, str],
     on_progress: Optional[Callable[[int, Optional[str], Optional[Exception]], None]] = None,
+    on_log: Optional[Callable[[str], None]] = None,
 ) -> Dict[int, GenerationResult]:
     results: Dict[int, GenerationResult] = {}
     lock = threading.Lock()
-    start = time.time()
 
     def task(shot_id: int, text: str) -> None:
         try:
             if on_progress:
                 on_progress(shot_id, None, None)
-            img_url = generate_image(client, cfg, style_image_data_url, text, on_progress if on_progress else None)
+            img_url = generate_image(client, cfg, style_image_data_url, text, on_log)
             with lock:
                 results[shot_id] = GenerationResult(
                     shot_id=shot_id,
@@ -273,11 +274,42 @@ def generate_images_concurrently(
             if on_progress:
                 on_progress(shot_id, None, e)
 
-    # Limit to one at a time per new requirement
-    for sid, text in shot_id_to_text.items():
-        if not text.strip():
-            continue
-        task(sid, text)
+    jobs = [(sid, text) for sid, text in shot_id_to_text.items() if text.strip()]
+    if not jobs:
+        return results
+    # Requests are network-bound; fan out on the shared pool, which holds the rate budget
+    pool = get_image_pool(cfg.max_concurrent_requests)
+    concurrent.futures.wait([pool.submit(task, sid, text) for sid, text in jobs])
     return results
 
 
+_image_pool: Optional[DaemonThreadPoolExecutor] = None
+_image_pool_size = 0
+_image_pool_lock = threading.Lock()
+
+
+def get_image_pool(max_workers: int) -> DaemonThreadPoolExecutor:
+    """Return the process-wide pool for image requests, created once and reused.
+
+    Single-shot and batch generation both submit here, so `max_workers` caps all
+    in-flight image requests together.
+    """
+    global _image_pool, _image_pool_size
+    max_workers = max(1, max_workers)
+    with _image_pool_lock:
+        if _image_pool is None or _image_pool_size != max_workers:
+            if _image_pool is not None:
+                # Requests already running finish on the old pool; its threads then exit
+                _image_pool.shutdown(wait=False)
+            _image_pool = DaemonThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="images")
+            _image_pool_size = max_workers
+        return _image_pool
+
+
+def shutdown_image_pool() -> None:
+    """Drop queued image requests and release the pool without waiting (app close)."""
+    global _image_pool, _image_pool_size
+    with _image_pool_lock:
+        pool, _image_pool, _image_pool_size = _image_pool, None, 0
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
@@ -4,6 +4,20 @@ import os
 from typing import Any, Dict, Optional
 
 import requests
+from requests.adapters import HTTPAdapter
+
+# Shared session so calls reuse TCP/TLS connections to OpenRouter (keep-alive)
+_SESSION: Optional[requests.Session] = None
+
+
+def get_session() -> requests.Session:
+    global _SESSION
+    if _SESSION is None:
+        session = requests.Session()
+        # Room for concurrent image generation workers
+        session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+        _SESSION = session
+    return _SESSION
 
 
 def chat_completions(
@@ -39,7 +53,7 @@ def chat_completions(
             if k not in ("model", "messages"):
                 payload[k] = v
 
-    resp = requests.post(
+    resp = get_session().post(
         "https://openrouter.ai/api/v1/chat/completions",
         headers=headers,
         json=payload,
@@ -1,34 +1,87 @@
 import base64
+import binascii
+import hashlib
 import io
 import os
+import threading
 import time
-from typing import Tuple
+from collections import OrderedDict
+from typing import Optional, Tuple
 
+import numpy as np
 from PIL import Image
 
+try:
+    # Optional: SIMD base64 with the same b64encode/b64decode API as the stdlib
+    import pybase64 as _b64
+except Exception:  # fallback to the stdlib codec
+    _b64 = base64
+
+# base64.b64decode re-encodes a str payload to bytes first; binascii reads the ASCII str in place
+_b64decode = binascii.a2b_base64 if _b64 is base64 else _b64.b64decode
+
+try:
+    # Optional: libjpeg-turbo bindings (SIMD encode/decode); needs the native libturbojpeg
+    from turbojpeg import TJFLAG_PROGRESSIVE, TJPF_RGB, TJSAMP_420, TurboJPEG
+    _TURBOJPEG = TurboJPEG()
+except Exception:  # fallback to Pillow's JPEG codec
+    _TURBOJPEG = None
+
 
 CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), ".cache")
 os.makedirs(CACHE_DIR, exist_ok=True)
 
+# Base64 characters decoded per step for large payloads (a multiple of 4)
+_B64_CHUNK = 64 * 1024
+
+# Compressed style images keyed by (input digest, max_width, quality)
+_COMPRESS_CACHE_MAX = 8
+_compress_cache: "OrderedDict[tuple, str]" = OrderedDict()
+_compress_cache_lock = threading.Lock()
+
 
 def image_to_data_url(image: Image.Image, format: str = "PNG") -> str:
     buffer = io.BytesIO()
     image.save(buffer, format=format)
-    b64 = base64.b64encode(buffer.getvalue()).decode("ascii")
+    b64 = _b64.b64encode(buffer.getvalue()).decode("ascii")
     mime = "image/png" if format.upper() == "PNG" else "image/jpeg"
     return f"data:{mime};base64,{b64}"
 
 
 def bytes_to_data_url(data: bytes, mime: str = "image/png") -> str:
-    b64 = base64.b64encode(data).decode("ascii")
+    b64 = _b64.b64encode(data).decode("ascii")
     return f"data:{mime};base64,{b64}"
 
 
-def save_data_url_png(data_url: str, prefix: str = "image") -> str:
-    if "," not in data_url:
+def _payload_start(data_url: str) -> int:
+    """Index of the base64 payload, just past the header comma."""
+    comma = data_url.find(",")
+    if comma < 0:
         raise ValueError("Invalid data URL")
-    header, b64 = data_url.split(",", 1)
-    data = base64.b64decode(b64)
+    return comma + 1
+
+
+def _decode_payload(data_url: str, start: int) -> bytes:
+    """Base64-decode `data_url[start:]` without first copying the whole payload out as a new string.
+
+    Large payloads are decoded in `_B64_CHUNK` slices into one growing buffer, so peak memory is
+    the data URL plus the decoded bytes rather than an extra payload-sized string on top.
+    """
+    if len(data_url) - start <= _B64_CHUNK:
+        return _b64decode(data_url[start:])
+    out = io.BytesIO()
+    try:
+        for i in range(start, len(data_url), _B64_CHUNK):
+            out.write(_b64decode(data_url[i: i + _B64_CHUNK]))
+    except (binascii.Error, ValueError):
+        # Embedded whitespace/newlines shifted the 4-char groups across chunks; decode in one go
+        return _b64decode(data_url[start:])
+    # getvalue() hands over the buffer without another copy
+    return out.getvalue()
+
+
+def save_data_url_png(data_url: str, prefix: str = "image") -> str:
+    data = _decode_payload(data_url, _payload_start(data_url))
     ts = int(time.time() * 1000)
     path = os.path.join(CACHE_DIR, f"{prefix}_{ts}.png")
     with open(path, "wb") as f:
@@ -43,17 +96,83 @@ def compress_image_bytes_to_jpeg_data_url(data: bytes, *, max_width: int = 1024,
     - Ensures RGB colorspace
     - Resizes to max_width while preserving aspect ratio
     - Uses JPEG quality and optimization for smaller payloads
+
+    Results are memoized on a digest of the input, so re-selecting the same style image is free.
     """
-    img = Image.open(io.BytesIO(data))
+    key = (hashlib.blake2b(data, digest_size=16).hexdigest(), max_width, quality)
+    with _compress_cache_lock:
+        if key in _compress_cache:
+            _compress_cache.move_to_end(key)
+            return _compress_cache[key]
+    img = _decode_downscaled(data, max_width=max_width)
     if img.mode in ("RGBA", "P"):
         img = img.convert("RGB")
     if img.width > max_width:
         new_height = int(img.height * (max_width / img.width))
         img = img.resize((max_width, new_height), Image.LANCZOS)
+    b64 = _b64.b64encode(encode_jpeg(img, quality=quality)).decode("ascii")
+    result = f"data:image/jpeg;base64,{b64}"
+    with _compress_cache_lock:
+        _compress_cache[key] = result
+        while len(_compress_cache) > _COMPRESS_CACHE_MAX:
+            _compress_cache.popitem(last=False)
+    return result
+
+
+def decode_jpeg_turbo(data: bytes, *, min_width: Optional[int] = None) -> Optional[Image.Image]:
+    """Decode JPEG `data` with libjpeg-turbo as an RGB image, or return None to use Pillow instead.
+
+    With `min_width`, the smallest DCT scale (1/2..1/8) that stays at least that wide is used.
+    None when turbojpeg is unavailable, `data` is not a JPEG, or the decode fails.
+    """
+    if _TURBOJPEG is None or data[:2] != b"\xff\xd8":
+        return None
+    try:
+        scale = (1, 1)
+        if min_width:
+            width, _height, _subsample, _colorspace = _TURBOJPEG.decode_header(data)
+            factors = [f for f in _TURBOJPEG.scaling_factors if f[0] == 1 and width * f[0] // f[1] >= min_width]
+            scale = max(factors, key=lambda f: f[1]) if factors else (1, 1)
+        rgb = _TURBOJPEG.decode(data, pixel_format=TJPF_RGB, scaling_factor=scale)
+        return Image.fromarray(rgb, "RGB")
+    except Exception:
+        return None
+
+
+def _decode_downscaled(data: bytes, *, max_width: int) -> Image.Image:
+    """Decode `data` at the smallest size that is still at least `max_width` wide.
+
+    JPEGs are decoded with a fractional IDCT (1/2, 1/4, 1/8) so a large source skips most of
+    the decode work; other formats decode at full size.
+    """
+    img = decode_jpeg_turbo(data, min_width=max_width)
+    if img is not None:
+        return img
+    img = Image.open(io.BytesIO(data))
+    if img.format == "JPEG" and img.width > max_width:
+        # Pillow's equivalent: pick a DCT scale during decode, never below the requested size
+        img.draft("RGB", (max_width, int(img.height * (max_width / img.width))))
+    return img
+
+
+def encode_jpeg(img: Image.Image, *, quality: int) -> bytes:
+    """Encode a PIL image as JPEG, preferring libjpeg-turbo when it is available.
+
+    Output is always 4:2:0 progressive: these images are model references, where chroma
+    detail does not matter and the smaller payload is sent with every request.
+    """
+    if _TURBOJPEG is not None:
+        rgb = img if img.mode == "RGB" else img.convert("RGB")
+        return _TURBOJPEG.encode(
+            np.asarray(rgb),
+            quality=quality,
+            pixel_format=TJPF_RGB,
+            jpeg_subsample=TJSAMP_420,
+            flags=TJFLAG_PROGRESSIVE,
+        )
     buffer = io.BytesIO()
-    img.save(buffer, format="JPEG", quality=quality, optimize=True)
-    b64 = base64.b64encode(buffer.getvalue()).decode("ascii")
-    return f"data:image/jpeg;base64,{b64}"
+    img.save(buffer, format="JPEG", quality=quality, optimize=True, progressive=True, subsampling="4:2:0")
+    return buffer.getvalue()
 
 
 
@@ -61,9 +180,8 @@ def data_url_to_bytes_and_mime(data_url: str) -> Tuple[bytes, str]:
     """
     Convert a data URL (data:<mime>;base64,...) to raw bytes and mime type.
     """
-    if "," not in data_url:
-        raise ValueError("Invalid data URL")
-    header, b64 = data_url.split(",", 1)
+    start = _payload_start(data_url)
+    header = data_url[: start - 1]
     # Extract mime type from header
     mime = "image/png"
     try:
@@ -71,7 +189,7 @@ def data_url_to_bytes_and_mime(data_url: str) -> Tuple[bytes, str]:
             mime = header[5: header.index(";")]
     except Exception:
         pass
-    return base64.b64decode(b64), mime
+    return _decode_payload(data_url, start), mime
 
 
 def save_data_url_png_to_dir(data_url: str, directory: str, prefix: str = "image") -> str:
@@ -79,14 +197,22 @@ def save_data_url_png_to_dir(data_url: str, directory: str, prefix: str = "image
     Save a data URL to a specific directory on the server (PNG extension).
     Creates the directory if it does not exist.
     """
-    os.makedirs(directory, exist_ok=True)
-    _, _ = os.path.split(directory)
+    return save_bytes_to_dir(_decode_payload(data_url, _payload_start(data_url)), directory, prefix=prefix)
+
+
+def save_bytes_to_dir(data: bytes, directory: str, prefix: str = "image", ext: str = "png") -> str:
+    """
+    Save raw image bytes to a specific directory, skipping any data URL round-trip.
+    Creates the directory if it does not exist.
+    """
     ts = int(time.time() * 1000)
-    path = os.path.join(directory, f"{prefix}_{ts}.png")
-    if "," not in data_url:
-        raise ValueError("Invalid data URL")
-    _, b64 = data_url.split(",", 1)
-    data = base64.b64decode(b64)
-    with open(path, "wb") as f:
+    path = os.path.join(directory, f"{prefix}_{ts}.{ext}")
+    try:
+        f = open(path, "wb")
+    except FileNotFoundError:
+        # Only the first save into a fresh directory pays for makedirs
+        os.makedirs(directory, exist_ok=True)
+        f = open(path, "wb")
+    with f:
         f.write(data)
     return path
@@ -1,5 +1,6 @@
 import os
 import re
+import threading
 import time
 from pathlib import Path
 from urllib.parse import urlparse
@@ -34,6 +35,8 @@ class ImageUpscaler:
         self._tile = tile
         self._tile_pad = tile_pad
         self._model_path = model_path  # None => auto-download/cache
+        # Guards one-time model load and inference (RealESRGANer keeps per-call state on itself)
+        self._lock = threading.RLock()
 
     # -------- Weights management --------
     def _get_weights_dir(self) -> Path:
@@ -177,10 +180,19 @@ class ImageUpscaler:
         print(f"🔍 No existing weights found, downloading {filename}...")
         return self._download_with_fallbacks(urls, dest)
 
+    def warm_up(self) -> None:
+        """Load weights and build the model ahead of the first upscale request."""
+        self._ensure_initialized()
+
     def _ensure_initialized(self):
         if self._initialized:
             return
+        with self._lock:
+            if self._initialized:
+                return
+            self._initialize()
 
+    def _initialize(self):
         half = torch.cuda.is_available()  # FP16 only on CUDA
 
         try:
@@ -286,7 +298,7 @@ class ImageUpscaler:
 
         t0 = time.time()
         try:
-            with torch.no_grad():
+            with self._lock, torch.no_grad():
                 try:
                     out_bgr, _ = self._upsampler.enhance(
                         img_bgr, outscale=float(outscale), denoise_strength=float(denoise_strength)
@@ -343,17 +355,19 @@ class ImageUpscaler:
 
 # Global instances for reuse (one per model)
 _upscaler_instances: dict[str, ImageUpscaler] = {}
+_upscaler_instances_lock = threading.Lock()
 
 def get_upscaler(model_name: str = 'realesr-general-x4v3', tile: int = 0, tile_pad: int = 10, model_path: str | None = None) -> ImageUpscaler:
     """Get or create an upscaler instance for the specified model."""
     global _upscaler_instances
     
-    if model_name not in _upscaler_instances:
-        _upscaler_instances[model_name] = ImageUpscaler(
-            model_name=model_name, 
-            tile=tile, 
-            tile_pad=tile_pad, 
-            model_path=model_path
-        )
+    with _upscaler_instances_lock:
+        if model_name not in _upscaler_instances:
+            _upscaler_instances[model_name] = ImageUpscaler(
+                model_name=model_name, 
+                tile=tile, 
+                tile_pad=tile_pad, 
+                model_path=model_path
+            )
     
     return _upscaler_instances[model_name]
\ No newline at end of file
@@ -1,51 +1,193 @@
 from __future__ import annotations
 
-import base64
+import hashlib
 import io
-from typing import List, Tuple, Optional
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import wraps
+from typing import Any, Callable, Iterator, List, Tuple, Optional, Union
 
-import cv2  # type: ignore
-import numpy as np
 from PIL import Image
 import math
 
+from src.services.storage import CACHE_DIR, bytes_to_data_url, data_url_to_bytes_and_mime, encode_jpeg
 
-def _frame_indices(total_frames: int, n: int) -> List[int]:
-    n = max(1, n)
-    return [max(0, min(total_frames - 1, round((i / (n + 1)) * total_frames))) for i in range(1, n + 1)]
+try:
+    # Optional: direct libav bindings decode from memory and seek by keyframe
+    import av  # type: ignore
+except Exception:  # OpenCV remains the fallback decoder
+    av = None
 
 
-def extract_frames_as_images(video_bytes: bytes, n: int = 5) -> List[Image.Image]:
-    arr = np.frombuffer(video_bytes, dtype=np.uint8)
-    video = cv2.imdecode(arr, cv2.IMREAD_COLOR)
-    if video is not None:
-        # imdecode isn't suitable for videos; fallback to VideoCapture from buffer via temp file
-        pass
-    # Use temp file for VideoCapture as OpenCV does not open from memory reliably
+# A video is passed either as raw bytes or as a path to a file on disk (preferred: no copy in memory)
+VideoSource = Union[bytes, str]
+
+# Middle-frame previews persisted across runs, named by a hash of the video key
+FRAME_CACHE_DIR = os.path.join(CACHE_DIR, "frames")
+# Previews kept on disk; the least recently used (by mtime) are removed past this
+FRAME_CACHE_MAX_FILES = 200
+
+# OpenCV fallback: below this average gap (frames) between samples, walking forward with grab()
+# beats seeking, which restarts decoding from the previous keyframe for every sample
+_CV2_WALK_MAX_GAP = 90
+
+# Decoded results keyed by (function, video key, args); small because entries hold base64 frames
+_SAMPLE_CACHE_MAX = 12
+_sample_cache: "OrderedDict[tuple, Any]" = OrderedDict()
+_sample_cache_lock = threading.Lock()
+
+
+def video_digest(video_bytes: bytes) -> str:
+    return hashlib.blake2b(video_bytes, digest_size=16).hexdigest()
+
+
+def _video_key(video: VideoSource) -> str:
+    if isinstance(video, str):
+        st = os.stat(video)
+        return f"{os.path.abspath(video)}:{st.st_size}:{st.st_mtime_ns}"
+    return video_digest(video)
+
+
+def _memoize_by_video(func: Callable[..., Any]) -> Callable[..., Any]:
+    """Memoize `func(video, ...)` on a key of the video so repeat calls skip the decode."""
+
+    @wraps(func)
+    def wrapper(video: VideoSource, *args: Any, **kwargs: Any) -> Any:
+        key = (func.__name__, _video_key(video), args, tuple(sorted(kwargs.items())))
+        with _sample_cache_lock:
+            if key in _sample_cache:
+                _sample_cache.move_to_end(key)
+                return _sample_cache[key]
+        result = func(video, *args, **kwargs)
+        with _sample_cache_lock:
+            _sample_cache[key] = result
+            while len(_sample_cache) > _SAMPLE_CACHE_MAX:
+                _sample_cache.popitem(last=False)
+        return result
+
+    return wrapper
+
+
+@contextmanager
+def _local_path(video: VideoSource) -> Iterator[str]:
+    """Yield a filesystem path for `video`, spooling bytes to a temp file only when needed."""
+    if isinstance(video, str):
+        yield video
+        return
     import tempfile
     with tempfile.NamedTemporaryFile(suffix=".mp4") as tmp:
-        tmp.write(video_bytes)
+        tmp.write(video)
         tmp.flush()
-        cap = cv2.VideoCapture(tmp.name)
+        yield tmp.name
+
+
+def _av_input(video: VideoSource) -> Any:
+    return video if isinstance(video, str) else io.BytesIO(video)
+
+
+def _sample_positions(n: int) -> List[float]:
+    """Evenly spaced positions (fractions of the duration) for `n` samples, excluding both ends."""
+    n = max(1, n)
+    return [i / (n + 1) for i in range(1, n + 1)]
+
+
+def _frame_indices(total_frames: int, positions: List[float]) -> List[int]:
+    return [max(0, min(total_frames - 1, round(p * total_frames))) for p in positions]
+
+
+def _downscale(img: Image.Image, max_width: int = 768) -> Image.Image:
+    # Downscale to reduce payload size; keep aspect ratio
+    if img.width > max_width:
+        new_height = int(img.height * (max_width / img.width))
+        img = img.resize((max_width, new_height), Image.LANCZOS)
+    return img
+
+
+def _extract_frames_av(video: VideoSource, positions: List[float]) -> List[Image.Image]:
+    """Decode the frames at `positions` with PyAV, seeking to the keyframe before each target."""
+    images: List[Image.Image] = []
+    with av.open(_av_input(video)) as container:
+        stream = container.streams.video[0]
+        # Let libav decode on multiple threads (frame + slice) while we walk the targets
+        stream.thread_type = "AUTO"
+        time_base = stream.time_base
+        start = stream.start_time or 0
+        if stream.duration:
+            duration = float(stream.duration * time_base)
+        elif container.duration:
+            duration = container.duration / av.time_base
+        else:
+            raise RuntimeError("Unknown video duration")
+        for p in positions:
+            target = start + int(p * duration / time_base)
+            container.seek(target, stream=stream, backward=True, any_frame=False)
+            for frame in container.decode(stream):
+                if frame.pts is None or frame.pts >= target:
+                    images.append(_downscale(frame.to_image()))
+                    break
+    return images
+
+
+def _extract_frames_cv2(video: VideoSource, positions: List[float]) -> List[Image.Image]:
+    # Imported on first use: OpenCV is only the fallback and costs noticeable startup time
+    import cv2  # type: ignore
+
+    # VideoCapture needs a file path; OpenCV does not open from memory reliably
+    with _local_path(video) as path:
+        cap = cv2.VideoCapture(path)
         if not cap.isOpened():
             raise RuntimeError("Failed to open video")
         total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-        indices = _frame_indices(total_frames, n)
+        indices = _frame_indices(total_frames, positions)
         images: List[Image.Image] = []
-        for idx in indices:
-            cap.set(cv2.CAP_PROP_POS_FRAMES, idx)
-            ok, frame = cap.read()
-            if not ok or frame is None:
-                continue
-            rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            img = Image.fromarray(rgb)
-            # Downscale to reduce payload size; keep aspect ratio, max width 768
-            max_width = 768
-            if img.width > max_width:
-                new_height = int(img.height * (max_width / img.width))
-                img = img.resize((max_width, new_height), Image.LANCZOS)
-            images.append(img)
+        dense = len(indices) > 1 and (indices[-1] - indices[0]) / (len(indices) - 1) <= _CV2_WALK_MAX_GAP
+        if dense and indices == sorted(indices):
+            # Samples are close together: one forward walk, grab() past skipped frames and
+            # retrieve() (colour convert + copy out) only the kept ones, instead of seeking each
+            cap.set(cv2.CAP_PROP_POS_FRAMES, indices[0])
+            pos = indices[0]
+            for idx in indices:
+                if idx < pos:
+                    # Short video: neighbouring samples round to the same frame
+                    if images:
+                        images.append(images[-1])
+                    continue
+                while pos < idx and cap.grab():
+                    pos += 1
+                ok = cap.grab()
+                pos += 1
+                ok, frame = cap.retrieve() if ok else (False, None)
+                if not ok or frame is None:
+                    continue
+                rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+                images.append(_downscale(Image.fromarray(rgb)))
+        else:
+            for idx in indices:
+                cap.set(cv2.CAP_PROP_POS_FRAMES, idx)
+                ok, frame = cap.read()
+                if not ok or frame is None:
+                    continue
+                rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+                images.append(_downscale(Image.fromarray(rgb)))
         cap.release()
+    return images
+
+
+def extract_frames_as_images(video: VideoSource, n: int = 5) -> List[Image.Image]:
+    return _extract_frames(video, _sample_positions(n))
+
+
+def _extract_frames(video: VideoSource, positions: List[float]) -> List[Image.Image]:
+    images: List[Image.Image] = []
+    if av is not None:
+        try:
+            images = _extract_frames_av(video, positions)
+        except Exception:  # noqa: BLE001
+            images = []
+    if not images:
+        images = _extract_frames_cv2(video, positions)
     if not images:
         raise RuntimeError("No frames extracted")
     return images
@@ -59,15 +201,17 @@ def image_to_data_url(img: Image.Image, *, format: str = "JPEG", quality: int =
         # Ensure RGB and use sane quality settings for smaller payloads
         if img.mode in ("RGBA", "P"):
             img = img.convert("RGB")
-        save_kwargs.update({"quality": quality, "optimize": True})
-    img.save(buffer, **save_kwargs)
-    b64 = base64.b64encode(buffer.getvalue()).decode("ascii")
+        data = encode_jpeg(img, quality=quality)
+    else:
+        img.save(buffer, **save_kwargs)
+        data = buffer.getvalue()
     mime = "image/jpeg" if fmt == "JPEG" else "image/png"
-    return f"data:{mime};base64,{b64}"
+    return bytes_to_data_url(data, mime=mime)
 
 
+@_memoize_by_video
 def estimate_context_frame_count(
-    video_bytes: bytes,
+    video: VideoSource,
     *,
     seconds_per_frame: float = 2.0,
     min_frames: int = 1,
@@ -78,20 +222,28 @@ def estimate_context_frame_count(
     Strategy: one frame every `seconds_per_frame` seconds, rounded up.
     Falls back conservatively if FPS metadata is unavailable.
     """
-    import tempfile
+    total_frames, fps = 0, 0.0
+    if av is not None:
+        try:
+            with av.open(_av_input(video)) as container:
+                stream = container.streams.video[0]
+                total_frames = int(stream.frames or 0)
+                fps = float(stream.average_rate or 0.0)
+        except Exception:  # noqa: BLE001
+            total_frames, fps = 0, 0.0
+    if total_frames <= 0:
+        try:
+            import cv2  # type: ignore
 
-    try:
-        with tempfile.NamedTemporaryFile(suffix=".mp4") as tmp:
-            tmp.write(video_bytes)
-            tmp.flush()
-            cap = cv2.VideoCapture(tmp.name)
-            if not cap.isOpened():
-                return max(1, min_frames)
-            total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-            fps = float(cap.get(cv2.CAP_PROP_FPS))
-            cap.release()
-    except Exception:
-        return max(1, min_frames)
+            with _local_path(video) as path:
+                cap = cv2.VideoCapture(path)
+                if not cap.isOpened():
+                    return max(1, min_frames)
+                total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+                fps = float(cap.get(cv2.CAP_PROP_FPS))
+                cap.release()
+        except Exception:
+            return max(1, min_frames)
 
     duration_sec = 0.0
     if fps and fps > 0 and total_frames > 0:
@@ -109,13 +261,86 @@ def estimate_context_frame_count(
     return max(min_frames, n)
 
 
-def sample_context_frames_as_data_urls(video_bytes: bytes, n: int = 5) -> List[str]:
-    images = extract_frames_as_images(video_bytes, n=n)
+@_memoize_by_video
+def sample_context_frames_as_data_urls(video: VideoSource, n: int = 5) -> List[str]:
+    images = extract_frames_as_images(video, n=n)
     return [image_to_data_url(img, format="JPEG", quality=85) for img in images]
 
 
-def sample_middle_frame_as_data_url(video_bytes: bytes) -> str:
-    images = extract_frames_as_images(video_bytes, n=5)
+@_memoize_by_video
+def sample_context_and_middle_frames_as_data_urls(video: VideoSource, n: int = 5) -> Tuple[List[str], str]:
+    """Return (context frames, middle frame) from a single pass over the video.
+
+    With an odd `n` the centre context sample is the middle frame; with an even `n` the
+    middle frame is decoded in the same walk, between the two central samples.
+    """
+    positions = _sample_positions(n)
+    half = len(positions) // 2
+    if len(positions) % 2 == 1:
+        urls = sample_context_frames_as_data_urls(video, n=n)
+        if len(urls) == len(positions):
+            return urls, urls[half]
+        return urls, sample_middle_frame_as_data_url(video)
+    images = _extract_frames(video, positions[:half] + [0.5] + positions[half:])
+    if len(images) != len(positions) + 1:
+        # A frame failed to decode, so results no longer line up with positions; sample separately
+        return sample_context_frames_as_data_urls(video, n=n), sample_middle_frame_as_data_url(video)
+    urls = [image_to_data_url(img, format="JPEG", quality=85) for img in images]
+    middle = urls.pop(half)
+    return urls, middle
+
+
+@_memoize_by_video
+def sample_middle_frame_as_data_url(video: VideoSource) -> str:
+    # Reopening a known video (same path/size/mtime, or same bytes) reads the JPEG from disk
+    cache_path = os.path.join(FRAME_CACHE_DIR, hashlib.sha1(_video_key(video).encode("utf-8")).hexdigest() + ".jpg")
+    try:
+        with open(cache_path, "rb") as f:
+            data = f.read()
+        # Bump mtime so pruning treats this entry as recently used
+        os.utime(cache_path)
+        return bytes_to_data_url(data, mime="image/jpeg")
+    except OSError:
+        pass
+    data_url = _sample_middle_frame(video)
+    try:
+        os.makedirs(FRAME_CACHE_DIR, exist_ok=True)
+        tmp_path = f"{cache_path}.{threading.get_ident()}.part"
+        with open(tmp_path, "wb") as f:
+            f.write(data_url_to_bytes_and_mime(data_url)[0])
+        os.replace(tmp_path, cache_path)
+        _prune_frame_cache()
+    except Exception:  # noqa: BLE001 - the cache is best-effort
+        pass
+    return data_url
+
+
+def _prune_frame_cache() -> None:
+    """Delete the oldest previews once FRAME_CACHE_DIR holds more than FRAME_CACHE_MAX_FILES."""
+    entries = []
+    with os.scandir(FRAME_CACHE_DIR) as it:
+        for entry in it:
+            if entry.name.endswith(".jpg"):
+                try:
+                    entries.append((entry.stat().st_mtime, entry.path))
+                except OSError:
+                    pass
+    if len(entries) <= FRAME_CACHE_MAX_FILES:
+        return
+    entries.sort()
+    for _mtime, path in entries[: len(entries) - FRAME_CACHE_MAX_FILES]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def _sample_middle_frame(video: VideoSource) -> str:
+    try:
+        # A single sample at 1/2 is the same frame as the middle of five; decode only that one
+        images = extract_frames_as_images(video, n=1)
+    except RuntimeError:
+        images = extract_frames_as_images(video, n=5)
     middle = images[len(images) // 2]
     return image_to_data_url(middle, format="JPEG", quality=85)
 
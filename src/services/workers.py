@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import queue
+import threading
+from concurrent.futures import Executor, Future
+from typing import Any, Callable, List, Optional
+
+
+class DaemonThreadPoolExecutor(Executor):
+    """A minimal thread pool whose workers are daemon threads.
+
+    `concurrent.futures.ThreadPoolExecutor` joins its (non-daemon) workers at interpreter
+    exit, so closing the window would wait for in-flight API calls, upscales or a model
+    download. Work here is abandoned at exit instead, like the GUI's original daemon threads.
+    Threads are started lazily, up to `max_workers`, and reused while idle.
+    """
+
+    def __init__(self, max_workers: int, thread_name_prefix: str = "worker") -> None:
+        self._max_workers = max(1, max_workers)
+        self._prefix = thread_name_prefix
+        self._queue: "queue.SimpleQueue[Optional[tuple]]" = queue.SimpleQueue()
+        self._idle = threading.Semaphore(0)
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._shutdown = False
+
+    def submit(self, fn: Callable[..., Any], /, *args: Any, **kwargs: Any) -> Future:
+        with self._lock:
+            if self._shutdown:
+                raise RuntimeError("cannot schedule new futures after shutdown")
+            future: Future = Future()
+            self._queue.put((future, fn, args, kwargs))
+            if not self._idle.acquire(timeout=0) and len(self._threads) < self._max_workers:
+                t = threading.Thread(target=self._work, name=f"{self._prefix}_{len(self._threads)}", daemon=True)
+                t.start()
+                self._threads.append(t)
+        return future
+
+    def _work(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            future, fn, args, kwargs = item
+            del item
+            if future.set_running_or_notify_cancel():
+                try:
+                    result = fn(*args, **kwargs)
+                except BaseException as e:  # noqa: BLE001 - delivered through the future
+                    future.set_exception(e)
+                else:
+                    future.set_result(result)
+            del future, fn, args, kwargs
+            self._idle.release()
+
+    def shutdown(self, wait: bool = True, *, cancel_futures: bool = False) -> None:
+        with self._lock:
+            if not self._shutdown:
+                self._shutdown = True
+                if cancel_futures:
+                    while True:
+                        try:
+                            item = self._queue.get_nowait()
+                        except queue.Empty:
+                            break
+                        if item is not None:
+                            item[0].cancel()
+                # One stop marker per worker, queued behind any work that was kept
+                for _ in self._threads:
+                    self._queue.put(None)
+            threads = list(self._threads)
+        if wait:
+            for t in threads:
+                t.join()